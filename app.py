@@ -11,20 +11,50 @@ from flask import session
 from werkzeug.exceptions import NotFound
 import os
 import csv
+import gzip
+import hashlib
 import io
+import ipaddress
+import json
+import multiprocessing
+import queue
 import sqlite3
-from datetime import datetime
+import asyncio
+import heapq
+import logging
+import math
+import mimetypes
+import re
+import secrets
+import smtplib
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from email.message import EmailMessage
+from email.utils import formataddr
 from functools import wraps
+from itertools import groupby, islice, repeat
+from urllib.parse import quote
 from io import StringIO
 from flask import Response
 from flask import render_template
 
 
+import click
 from flask import (
-    Flask, render_template, request, redirect,
-    url_for, session, flash, g, send_file, Response, send_from_directory
+    Flask, Blueprint, render_template, request, redirect, current_app,
+    url_for, session, flash, g, send_file, Response, send_from_directory,
+    has_request_context, jsonify
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask.cli import with_appcontext
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 
 # Optional: PDF certificate
 try:
@@ -35,21 +65,32 @@ try:
 except Exception:
     REPORTLAB_AVAILABLE = False
 
+# Optional: brotli for built assets and responses (pip install brotli)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+# Optional: zstd response compression (pip install zstandard)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except Exception:
+    ZSTD_AVAILABLE = False
+
 
-# Flask app & configuration
+# Routes live on this blueprint; create_app() (bottom of file) builds the app.
 
-app = Flask(__name__, instance_relative_config=True)
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-CHANGE-ME")
-os.makedirs(app.instance_path, exist_ok=True)
-DB_PATH = os.path.join(app.instance_path, "app.db")
+bp = Blueprint("main", __name__)
 
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found(e):
     return render_template("404.html"), 404
 
 
-@app.template_filter('datetimeformat')
+@bp.app_template_filter('datetimeformat')
 def datetimeformat(value, fmt=None):
     if not value:
         return ""
@@ -71,39 +112,757 @@ def datetimeformat(value, fmt=None):
         return value
 
 
+# SQL profiling
+
+slow_sql_log = logging.getLogger("volunteer_hub.slow_sql")
+
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_query_plans = {}  # normalized SQL -> (plan lines, full_scan), process-wide
+_plan_cache_stats = {"hits": 0, "misses": 0}
+_plan_lock = threading.Lock()
+
+
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals with ? so equal queries group."""
+    return _SQL_LITERALS.sub("?", " ".join(sql.split()))
+
+
+_PLAN_SCAN = re.compile(r"SCAN (?:TABLE )?(\S+)(.*)")
+
+
+def is_full_scan(plan):
+    """True when a plan step reads a whole real table.
+
+    "SCAN t" does. "SCAN t USING [COVERING] INDEX ..." does not, and neither do
+    R*Tree lookups ("SCAN g VIRTUAL TABLE INDEX ..."), CONSTANT ROW, or scans of
+    a subquery or CTE the plan builds itself (CO-ROUTINE x / MATERIALIZE x,
+    then SCAN x).
+    """
+    derived = set()
+    for p in plan:
+        head, _, name = p.partition(" ")
+        if head in ("CO-ROUTINE", "MATERIALIZE"):
+            derived.add(name.strip())
+    for p in plan:
+        m = _PLAN_SCAN.match(p)
+        if not m:
+            continue
+        name, rest = m.groups()
+        if "USING" in rest or "VIRTUAL TABLE" in rest:
+            continue
+        if name in derived or name.startswith("(") or name in ("CONSTANT", "SUBQUERY"):
+            continue
+        return True
+    return False
+
+
+def _plan_for(conn, sql, params, norm):
+    """EXPLAIN QUERY PLAN the first time a statement is seen."""
+    with _plan_lock:
+        cached = _query_plans.get(norm)
+        _plan_cache_stats["misses" if cached is None else "hits"] += 1
+    if cached is not None:
+        return cached
+    plan, full_scan = [], False
+    if norm.split(" ", 1)[0].upper() in ("SELECT", "WITH", "UPDATE", "DELETE"):
+        try:
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.Error:
+            rows = []
+        plan = [r[3] for r in rows]
+        full_scan = is_full_scan(plan)
+    # Two threads may explain the same new statement; the first one stores and logs it.
+    with _plan_lock:
+        cached = _query_plans.setdefault(norm, (plan, full_scan))
+    if cached[1] and cached[0] is plan:
+        slow_sql_log.warning("full table scan: %s | plan: %s", norm, "; ".join(plan))
+    return cached
+
+
+class SQLProfile:
+    """Statements executed while handling one request."""
+
+    def __init__(self, slow_ms):
+        self.slow_ms = slow_ms
+        self.queries = []
+
+    def start(self, conn, sql, params):
+        norm = normalize_sql(sql)
+        plan, full_scan = _plan_for(conn, sql, params, norm)
+        entry = {"sql": norm, "ms": 0.0, "rows": 0, "plan": plan, "full_scan": full_scan}
+        self.queries.append(entry)
+        return entry
+
+    def finish(self, entry, seconds, rows):
+        entry["ms"] += seconds * 1000.0
+        entry["rows"] += int(rows)
+
+    def record(self, conn, sql, params, seconds, rows):
+        self.finish(self.start(conn, sql, params), seconds, rows)
+
+    def log_slow(self, path):
+        for q in self.queries:
+            if q["ms"] >= self.slow_ms:
+                slow_sql_log.warning("%.1f ms, %d rows%s, %s: %s", q["ms"], q["rows"],
+                                     " [FULL SCAN]" if q["full_scan"] else "", path, q["sql"])
+
+    @property
+    def total_ms(self):
+        return sum(q["ms"] for q in self.queries)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that reports execute + fetch time and row counts to a SQLProfile."""
+
+    _entry = None
+
+    def execute(self, sql, params=()):
+        profile = self.connection.profile
+        if profile is None:
+            try:
+                return super().execute(sql, params)
+            except sqlite3.OperationalError as e:
+                count_busy(self.connection.metrics, e)
+                raise
+        self._entry = profile.start(self.connection, sql, params)
+        t0 = time.perf_counter()
+        try:
+            super().execute(sql, params)
+        except sqlite3.OperationalError as e:
+            count_busy(self.connection.metrics, e)
+            raise
+        rows = self.rowcount if self.rowcount > 0 else 0
+        profile.finish(self._entry, time.perf_counter() - t0, rows)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        profile = self.connection.profile
+        if profile is None:
+            return super().executemany(sql, seq_of_params)
+        entry = profile.start(self.connection, sql, ())
+        t0 = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_params)
+        except sqlite3.OperationalError as e:
+            count_busy(self.connection.metrics, e)
+            raise
+        profile.finish(entry, time.perf_counter() - t0, max(self.rowcount, 0))
+        return self
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        if self._entry is not None:
+            self.connection.profile.finish(self._entry, time.perf_counter() - t0, row is not None)
+        return row
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        if self._entry is not None:
+            self.connection.profile.finish(self._entry, time.perf_counter() - t0, len(rows))
+        return rows
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3.Connection whose execute() goes through ProfiledCursor."""
+
+    profile = None
+    metrics = None
+
+    def commit(self):
+        try:
+            super().commit()
+        except sqlite3.OperationalError as e:
+            count_busy(self.metrics, e)
+            raise
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def sql_profile():
+    """The current request's SQLProfile, or None when profiling is off."""
+    return g.get("sql_profile") if has_request_context() else None
+
+
+@bp.before_app_request
+def start_sql_profile():
+    g.request_started = time.perf_counter()
+    enabled = current_app.config["SQL_PROFILE"]
+    if enabled is None:
+        enabled = current_app.debug or bool(current_app.config["SQL_PANEL"])
+    if enabled:
+        g.sql_profile = SQLProfile(current_app.config["SLOW_QUERY_MS"])
+
+
+@bp.after_app_request
+def add_server_timing(response):
+    """Expose DB time and query count as a Server-Timing header."""
+    profile = g.get("sql_profile")
+    if profile is not None:
+        profile.log_slow(request.path)
+        total = (time.perf_counter() - g.request_started) * 1000.0
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={profile.total_ms:.1f};desc="{len(profile.queries)} queries", app;dur={total:.1f}',
+        )
+    return response
+
+
+# Metrics (Prometheus text format, served at /metrics)
+
+class Metrics:
+    """Tiny in-process metrics registry: counters, histograms and collectors.
+
+    Each worker process keeps its own numbers; a scrape sees the worker
+    that answered it.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.help = {}
+        self.collectors = []  # callables returning [(name, type, help, [(labels, value)])]
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(sorted(dict(labels).items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, tuple(sorted(dict(labels).items())))
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [0] * (len(self.BUCKETS) + 2)
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    h[i] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    @staticmethod
+    def _labels(pairs):
+        if not pairs:
+            return ""
+        body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                        for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self):
+        out = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((k, list(v)) for k, v in self.histograms.items())
+        families = {}
+        for (name, labels), value in counters:
+            families.setdefault(name, []).append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), h in histograms:
+            lines = families.setdefault(name, [])
+            for i, bound in enumerate(self.BUCKETS):
+                lines.append(f"{name}_bucket{self._labels(labels + (('le', bound),))} {h[i]}")
+            lines.append(f"{name}_bucket{self._labels(labels + (('le', '+Inf'),))} {h[-1]}")
+            lines.append(f"{name}_sum{self._labels(labels)} {h[-2]:.6f}")
+            lines.append(f"{name}_count{self._labels(labels)} {h[-1]}")
+        for collect in self.collectors:
+            for name, kind, text, samples in collect():
+                self.help.setdefault(name, (kind, text))
+                families[name] = [f"{name}{self._labels(tuple(labels))} {value}"
+                                  for labels, value in samples]
+        for name in sorted(families):
+            kind, text = self.help.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(families[name])
+        return "\n".join(out) + "\n"
+
+
+def metrics():
+    return current_app.extensions["metrics"]
+
+
+def _new_metrics(app):
+    m = Metrics()
+    m.describe("http_request_duration_seconds", "histogram", "Request latency by Flask endpoint.")
+    m.describe("http_requests_total", "counter", "Requests by endpoint, method and status.")
+    m.describe("sqlite_busy_errors_total", "counter", "SQLite 'database is locked/busy' errors.")
+    m.describe("db_connections_opened_total", "counter", "SQLite connections opened (rw: get_db(), ro: read pool).")
+    m.describe("volunteer_actions_total", "counter",
+               "Registrations, cancellations, hour submissions, approvals and rejections.")
+
+    def collect_pool():
+        pool = app.extensions.get("read_pool")
+        if pool is None:
+            return []
+        return [
+            ("read_pool_size", "gauge", "Connections allowed in the read pool.", [((), pool.size)]),
+            ("read_pool_connections", "gauge", "Read-only connections opened so far.", [((), pool.opened)]),
+            ("read_pool_queue_depth", "gauge", "Read queries waiting for a free connection.",
+             [((), pool.waiting)]),
+        ]
+
+    def collect_caches():
+        with _plan_lock:
+            stats = {"sql_plan": (_plan_cache_stats["hits"], _plan_cache_stats["misses"])}
+        for name, fn in app.extensions.get("cache_stats", {}).items():
+            stats[name] = fn()
+        hits = [((("cache", c),), h) for c, (h, _m) in stats.items()]
+        misses = [((("cache", c),), mi) for c, (_h, mi) in stats.items()]
+        ratio = [((("cache", c),), round(h / (h + mi), 4) if h + mi else 0.0)
+                 for c, (h, mi) in stats.items()]
+        return [
+            ("cache_hits_total", "counter", "Cache hits by cache.", hits),
+            ("cache_misses_total", "counter", "Cache misses by cache.", misses),
+            ("cache_hit_ratio", "gauge", "hits / (hits + misses) since start.", ratio),
+        ]
+
+    def collect_hashing():
+        pool = app.extensions.get("hash_pool")
+        if pool is None:
+            return []
+        return [
+            ("password_hash_workers", "gauge", "Threads available for password hashing.", [((), pool.workers)]),
+            ("password_hash_in_flight", "gauge", "Password hashes running or queued.", [((), pool.in_flight)]),
+            ("password_hash_queue_depth", "gauge", "Password hashes waiting for a thread.",
+             [((), max(0, pool.in_flight - pool.workers))]),
+            ("password_hash_queue_limit", "gauge", "Waiting hashes allowed before requests get 503.",
+             [((), pool.max_queue)]),
+        ]
+
+    m.describe("password_hash_seconds", "histogram", "Time spent hashing or checking one password.")
+    m.describe("password_hash_wait_seconds", "histogram", "Time a password hash waited for a thread.")
+    m.describe("password_hash_rejected_total", "counter", "Hashes refused because the queue was full.")
+    m.describe("auth_rate_limited_total", "counter", "Login/register attempts refused by the rate limiter.")
+    m.describe("http_compressed_responses_total", "counter", "Responses compressed, by encoding.")
+    m.describe("http_compression_bytes_in_total", "counter", "Response bytes before compression, by encoding.")
+    m.describe("http_compression_bytes_out_total", "counter", "Response bytes after compression, by encoding.")
+    m.describe("http_compression_cpu_seconds_total", "counter", "Thread CPU time spent compressing, by encoding.")
+    def collect_outbox():
+        try:
+            stats = outbox_stats(get_db())
+        except sqlite3.OperationalError:  # no notifications table yet (run init-db)
+            return []
+        return [
+            ("notifications_outbox", "gauge", "Notification rows by status.",
+             [((("status", st),), n) for st, n in stats["by_status"].items()]),
+            ("notifications_oldest_pending_seconds", "gauge", "Age of the oldest unsent notification.",
+             [((), stats["oldest_pending_seconds"])]),
+            ("notifications_sent_last_hour", "gauge", "Notifications delivered in the past hour.",
+             [((), stats["sent_last_hour"])]),
+        ]
+
+    m.collectors += [collect_pool, collect_caches, collect_hashing, collect_outbox]
+    return m
+
+
+def count_busy(m, exc):
+    """Count SQLite lock contention errors; call from an except block."""
+    msg = str(exc).lower()
+    if m is not None and ("locked" in msg or "busy" in msg):
+        m.inc("sqlite_busy_errors_total")
+
+
+def count_action(action, n=1):
+    metrics().inc("volunteer_actions_total", {"action": action}, n)
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is not None:
+        endpoint = request.endpoint or "unmatched"
+        m = metrics()
+        m.observe("http_request_duration_seconds", time.perf_counter() - started,
+                  {"endpoint": endpoint, "method": request.method})
+        m.inc("http_requests_total",
+              {"endpoint": endpoint, "method": request.method, "status": response.status_code})
+    return response
+
+
+def metrics_allowed():
+    """METRICS_TOKEN set: the bearer token is required. Unset: local scrapes only.
+
+    A request relayed by a proxy (X-Forwarded-For) is not local, even when
+    the proxy itself connects from 127.0.0.1.
+    """
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        return secrets.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    if "X-Forwarded-For" in request.headers or "Forwarded" in request.headers:
+        return False
+    try:
+        return ipaddress.ip_address(request.remote_addr or "").is_loopback
+    except ValueError:
+        return False
+
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    if not metrics_allowed():
+        return Response("forbidden\n", status=403, mimetype="text/plain")
+    return Response(metrics().render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
 # Database
 
 def get_db():
     """Get a SQLite connection stored on the app context (g)."""
     if "db" not in g:
-        conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn = sqlite3.connect(current_app.config["DATABASE"],
+                               timeout=current_app.config["DB_BUSY_TIMEOUT"],
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               factory=ProfiledConnection)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.profile = sql_profile()
+        conn.metrics = current_app.extensions.get("metrics")
+        if conn.metrics is not None:
+            conn.metrics.inc("db_connections_opened_total", {"mode": "rw"})
         g.db = conn
     return g.db
 
 
-@app.teardown_appcontext
 def close_db(exc):
     db = g.pop("db", None)
+    snapshot = g.pop("report_db", None)
+    if snapshot is not None and snapshot is not db:
+        snapshot.close()
     if db is not None:
         db.close()
 
 
-def init_db():
-    """Initialize DB schema from schema.sql."""
-    with app.open_resource("schema.sql") as f:
-        get_db().executescript(f.read().decode("utf-8"))
-    get_db().commit()
+@bp.after_app_request
+def end_db_transaction(response):
+    """Roll back whatever a view left uncommitted (close_db would anyway).
+
+    Done before the response goes out so the session save that follows is
+    not blocked by this request's own write lock, e.g. after an INSERT that
+    failed with IntegrityError.
+    """
+    db = g.get("db")
+    if db is not None and db.in_transaction:
+        db.rollback()
+    return response
+
+
+class ReadPool:
+    """Up to `size` read-only connections shared by the public pages.
+
+    Public pages only read, so they borrow one of these instead of opening
+    a fresh connection per request. The database is switched to WAL mode,
+    so these readers never wait on (or block) the single writer; writes keep
+    going through get_db() and stay serialized by SQLite. When every
+    connection is busy, the caller waits for one to come back.
+
+    Under ASGI (see asgi.py) aquery() hands the query to one of `size`
+    reader threads so the event loop keeps serving; under WSGI there is no
+    loop and it runs on the request thread, like query().
+    """
+
+    def __init__(self, path, size=8, metrics=None):
+        self.path = path
+        self.size = size
+        self.metrics = metrics
+        self.opened = 0
+        self.waiting = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db-read")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.close()
+
+    def warm(self):
+        """Open every connection up front."""
+        for conn in [self._acquire() for _ in range(self.size)]:
+            self._idle.put(conn)
+
+    def _open(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False,
+                               detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+        if self.metrics is not None:
+            self.metrics.inc("db_connections_opened_total", {"mode": "ro"})
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self.opened < self.size
+            if grow:
+                self.opened += 1
+            else:
+                self.waiting += 1
+        if grow:
+            try:
+                return self._open()
+            except sqlite3.Error:
+                with self._lock:
+                    self.opened -= 1
+                raise
+        try:
+            return self._idle.get()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def _run(self, sql, params, one, profile):
+        conn = self._acquire()
+        t0 = time.perf_counter()
+        try:
+            cur = conn.execute(sql, params)
+            result = cur.fetchone() if one else cur.fetchall()
+            if profile is not None:
+                rows = (result is not None) if one else len(result)
+                profile.record(conn, sql, params, time.perf_counter() - t0, rows)
+        except sqlite3.OperationalError as e:
+            count_busy(self.metrics, e)
+            raise
+        finally:
+            self._idle.put(conn)
+        return result
+
+    def query(self, sql, params=(), one=False):
+        """Run a read query on a pooled connection and return the rows."""
+        return self._run(sql, params, one, sql_profile())
+
+    async def aquery(self, sql, params=(), one=False):
+        """query() for async views; only leaves the thread when a loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.query(sql, params, one)
+        return await loop.run_in_executor(self.executor, self._run, sql, params, one, sql_profile())
+
+
+def run_inline(func):
+    """Run an async view on the calling thread, for WSGI servers.
+
+    Flask's default hands every coroutine to a fresh event loop. Without a
+    running loop ReadPool.aquery() returns straight away, so the read views
+    never suspend and can simply be stepped to completion here.
+    """
+    @wraps(func)
+    def view(*args, **kwargs):
+        coro = func(*args, **kwargs)
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return done.value
+        coro.close()
+        raise RuntimeError(f"{func.__name__} awaited outside an event loop; serve it through asgi.py")
+    return view
+
+
+_read_pool_lock = threading.Lock()
+
+
+def read_db():
+    """Get the app-wide ReadPool, creating it on first use."""
+    app = current_app
+    pool = app.extensions.get("read_pool")
+    if pool is None:
+        with _read_pool_lock:
+            pool = app.extensions.get("read_pool")
+            if pool is None:
+                pool = app.extensions["read_pool"] = ReadPool(
+                    app.config["DATABASE"], app.config["READ_POOL_SIZE"],
+                    app.extensions.get("metrics"))
+    return pool
+
+
+# Columns added after a table first shipped. CREATE TABLE IF NOT EXISTS
+# leaves older databases alone, so init-db adds these before the schema runs.
+ADDED_COLUMNS = {
+    "events": (("lat", "REAL"), ("lng", "REAL"), ("series_id", "INTEGER")),
+}
 
 
-@app.cli.command("init-db")
+def init_db():
+    """Initialize DB schema from schema.sql."""
+    db = get_db()
+    for table, cols in ADDED_COLUMNS.items():
+        have = {r["name"] for r in db.execute(f"PRAGMA table_info({table})")}
+        for name, typ in cols:
+            if have and name not in have:
+                db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {typ}")
+    with current_app.open_resource("schema.sql") as f:
+        db.executescript(f.read().decode("utf-8"))
+    db.commit()
+    current_app.extensions.pop("history_columns", None)
+    if live_archive():
+        _attach_archive(db, live_archive())
+        _sync_archive_schema(db)
+    # An upgraded database gets report_rollups empty; the triggers only add
+    # deltas from here on, so fill it once (archived history included).
+    if db.execute("SELECT 1 FROM report_rollups LIMIT 1").fetchone() is None:
+        db = history_db()
+        if db.execute("SELECT 1 FROM all_registrations LIMIT 1").fetchone():
+            rebuild_rollups(db, "all_events", "all_registrations")
+
+
+@click.command("init-db")
+@with_appcontext
 def init_db_command():
     """CLI: flask --app app.py init-db"""
     init_db()
     print("Initialized the database.")
 
 
+# Server-side sessions (SESSION_BACKEND = "sqlite"; "cookie" keeps Flask's
+# signed-cookie sessions). Another backend only needs to implement Flask's
+# SessionInterface and be assigned to app.session_interface.
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id and whether it changed."""
+
+    def __init__(self, initial=None, sid=None, new=False, user_id=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.loaded_user_id = user_id
+        self.modified = False
+        self.touch = False
+
+
+class SqliteSessionInterface(SessionInterface):
+    """Sessions stored in the `sessions` table; the cookie holds only a random id.
+
+    Recently used sessions are kept in an in-process LRU for `cache_ttl`
+    seconds. The role stored in a session is kept current by triggers on
+    users (see schema.sql), so after a role change or account deletion the
+    change shows up within `cache_ttl` seconds, with no per-request users
+    lookup. Expired rows are swept at most every `sweep_interval` seconds.
+    """
+
+    serializer = TaggedJSONSerializer()  # same types as Flask's cookie sessions
+    SID_RE = re.compile(r"^[A-Za-z0-9_-]{32,64}$")
+
+    def __init__(self, path, busy_timeout=5.0, cache_size=10_000, cache_ttl=5.0, sweep_interval=300.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.sweep_interval = sweep_interval
+        self._cache = OrderedDict()  # sid -> (data, user_id, expires_at, cached_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_sweep = time.time() + sweep_interval
+        self.hits = self.misses = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                                      check_same_thread=False)
+            conn.execute("PRAGMA synchronous = NORMAL;")
+        return conn
+
+    def _cached(self, sid, now):
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry and now - entry[3] < self.cache_ttl and entry[2] > now:
+                self._cache.move_to_end(sid)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return None
+
+    def _remember(self, sid, data, user_id, expires_at, now):
+        with self._lock:
+            self._cache[sid] = (data, user_id, expires_at, now)
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+
+    def open_session(self, app, request):
+        now = time.time()
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid or not self.SID_RE.match(sid):
+            return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+        entry = self._cached(sid, now)
+        if entry is None:
+            row = self._conn().execute(
+                "SELECT data, user_id, expires_at FROM sessions WHERE id = ? AND expires_at > ?",
+                (sid, now)).fetchone()
+            if row is None:
+                self._forget(sid)
+                return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+            entry = (row[0], row[1], row[2], now)
+            self._remember(sid, *entry)
+        data, user_id, expires_at, _cached_at = entry
+        sess = ServerSession(self.serializer.loads(data), sid=sid, user_id=user_id)
+        # Slide the expiry forward once less than half the lifetime is left.
+        sess.touch = expires_at - now < app.permanent_session_lifetime.total_seconds() / 2
+        return sess
+
+    def save_session(self, app, session, response):
+        name, domain, path = self.get_cookie_name(app), self.get_cookie_domain(app), self.get_cookie_path(app)
+        secure, samesite, httponly = (self.get_cookie_secure(app), self.get_cookie_samesite(app),
+                                      self.get_cookie_httponly(app))
+        if session.accessed:
+            response.vary.add("Cookie")
+        conn = self._conn()
+        now = time.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            conn.commit()
+
+        if not session:
+            if not session.new:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session.sid,))
+                conn.commit()
+                self._forget(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+        if not (session.modified or session.new or session.touch):
+            return
+
+        user_id = session.get("user_id")
+        if not session.new and user_id != session.loaded_user_id:
+            # Logging in or out: move to a fresh id so an old cookie can't ride along.
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session.sid,))
+            self._forget(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.new = True
+        expires_at = now + app.permanent_session_lifetime.total_seconds()
+        data = self.serializer.dumps(dict(session))
+        conn.execute("INSERT OR REPLACE INTO sessions (id, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+                     (session.sid, user_id, data, expires_at))
+        conn.commit()
+        self._remember(session.sid, data, user_id, expires_at, now)
+        if session.new or session.permanent:
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path, secure=secure,
+                                samesite=samesite)
+
+
 # i18n: super-light translations
 TRANSLATIONS = {
     "ar": {
@@ -213,11 +972,71 @@ TRANSLATIONS = {
         "not_found_title": "الصفحة غير موجودة",
         "not_found_msg": "يبدو أنك وصلت إلى رابط غير متوفر.",
         "back_to_dashboard": "العودة للوحة الإدارة",
+        "reports": "التقارير",
+        "report_from": "من شهر",
+        "report_to": "إلى شهر",
+        "show": "عرض",
+        "month": "الشهر",
+        "registrations": "التسجيلات",
+        "attendance_rate": "نسبة الحضور",
+        "cancellation_rate": "نسبة الإلغاء",
+        "prev_year": "العام السابق",
+        "by_month": "حسب الشهر",
+        "by_location": "حسب الموقع",
+        "by_event": "حسب الفعالية",
         "date_time": "التاريخ والوقت",
         "dt_fmt": "%d-%m-%Y %H:%M",
         "from": "من",
         "to": "إلى",
-        "event_created_duration": "تم إنشاء الفعالية ({title}) ومدتها {hours:.2f} ساعة ✅"
+        "event_created_duration": "تم إنشاء الفعالية ({title}) ومدتها {hours:.2f} ساعة ✅",
+        "import_events": "استيراد فعاليات",
+        "import_events_hint": "ملف CSV أو JSONL بالأعمدة: title, start_dt, end_dt, location, capacity, description, lat, lng",
+        "import_btn": "استيراد",
+        "import_users": "استيراد متطوعين",
+        "import_users_hint": "ملف CSV أو JSONL بالأعمدة: name, email, password, role",
+        "import_choose_file": "اختر ملفاً للاستيراد.",
+        "import_report": "تقرير الاستيراد",
+        "rows_imported": "صفوف مستوردة",
+        "rows_rejected": "صفوف مرفوضة",
+        "line": "السطر",
+        "error": "الخطأ",
+        "seconds": "ثانية",
+        "nearby_events": "فعاليات قريبة",
+        "latitude": "خط العرض",
+        "longitude": "خط الطول",
+        "radius_km": "المسافة (كم)",
+        "sort_by": "الترتيب حسب",
+        "distance": "المسافة",
+        "use_my_location": "استخدم موقعي",
+        "km_away": "على بعد {km} كم",
+        "coordinates_hint": "اختياري: يظهر الموقع في بحث الفعاليات القريبة.",
+        "conflict_blocked": "لا يمكن التسجيل: الفعالية تتعارض مع تسجيلاتك في: {titles}",
+        "my_conflicts": "تعارضات جدولي",
+        "no_conflicts": "لا توجد تعارضات في جدولك.",
+        "conflict_group": "فعاليات متداخلة",
+        "series_created": "تم إنشاء سلسلة الفعاليات المتكررة ({title}) ✅",
+        "series_deleted": "تم إيقاف السلسلة.",
+        "repeat": "التكرار",
+        "repeat_none": "بدون تكرار",
+        "repeat_daily": "يومياً",
+        "repeat_weekly": "أسبوعياً",
+        "repeat_every": "كل (عدد)",
+        "repeat_until": "حتى تاريخ",
+        "repeat_count": "عدد المرات",
+        "event_series": "الفعاليات المتكررة",
+        "part_of_series": "جزء من سلسلة متكررة.",
+        "series_calendar": "أضف السلسلة إلى التقويم",
+        "too_many_attempts": "محاولات كثيرة جداً. يرجى الانتظار قليلاً ثم المحاولة مرة أخرى.",
+        "server_busy": "الخادم مشغول حالياً. يرجى المحاولة بعد لحظات.",
+        "notify_subject": "مركز المتطوعين: {count} تحديث جديد",
+        "notify_greeting": "مرحباً {name}،",
+        "notify_hours_approved": "{title} ({date}): تم اعتماد {hours} ساعة.",
+        "notify_hours_rejected": "{title} ({date}): لم يتم اعتماد الساعات المرسلة.",
+        "notify_event_updated": "{title}: تغيّرت التفاصيل، الموعد الآن {date} في {location}.",
+        "notify_footer": "هذه رسالة تلقائية من مركز المتطوعين.",
+        "report_snapshot_note": "البيانات حتى {time} UTC (من آخر نسخة احتياطية).",
+        "import_users_too_many": "الملف يتجاوز {limit} صف. استخدم الأمر flask import-users للملفات الكبيرة.",
+        "occurrence_started": "بدأت هذه الفعالية بالفعل ولم يعد التسجيل فيها متاحاً."
 
 
 
@@ -339,11 +1158,71 @@ TRANSLATIONS = {
         "not_found_title": "Page not found",
         "not_found_msg": "It looks like you reached a page that doesn’t exist.",
         "back_to_dashboard": "Back to Admin Dashboard",
+        "reports": "Reports",
+        "report_from": "From month",
+        "report_to": "To month",
+        "show": "Show",
+        "month": "Month",
+        "registrations": "Registrations",
+        "attendance_rate": "Attendance rate",
+        "cancellation_rate": "Cancellation rate",
+        "prev_year": "Previous year",
+        "by_month": "By month",
+        "by_location": "By location",
+        "by_event": "By event",
         "date_time": "Date & Time",
         "dt_fmt": "%Y-%m-%d %H:%M",
         "from": "From",
         "to": "To",
-        "event_created_duration": "Event ({title}) created successfully with a duration of {hours:.2f} hours ✅"
+        "event_created_duration": "Event ({title}) created successfully with a duration of {hours:.2f} hours ✅",
+        "import_events": "Import events",
+        "import_events_hint": "CSV or JSONL file with columns: title, start_dt, end_dt, location, capacity, description, lat, lng",
+        "import_btn": "Import",
+        "import_users": "Import volunteers",
+        "import_users_hint": "CSV or JSONL file with columns: name, email, password, role",
+        "import_choose_file": "Choose a file to import.",
+        "import_report": "Import report",
+        "rows_imported": "Rows imported",
+        "rows_rejected": "Rows rejected",
+        "line": "Line",
+        "error": "Error",
+        "seconds": "seconds",
+        "nearby_events": "Events near you",
+        "latitude": "Latitude",
+        "longitude": "Longitude",
+        "radius_km": "Radius (km)",
+        "sort_by": "Sort by",
+        "distance": "Distance",
+        "use_my_location": "Use my location",
+        "km_away": "{km} km away",
+        "coordinates_hint": "Optional: lets volunteers find the event in the near-me search.",
+        "conflict_blocked": "Can't register: this event overlaps your registrations for: {titles}",
+        "my_conflicts": "My schedule conflicts",
+        "no_conflicts": "No overlapping registrations.",
+        "conflict_group": "Overlapping events",
+        "series_created": "Recurring event ({title}) created ✅",
+        "series_deleted": "Series stopped.",
+        "repeat": "Repeat",
+        "repeat_none": "Does not repeat",
+        "repeat_daily": "Daily",
+        "repeat_weekly": "Weekly",
+        "repeat_every": "Every (n)",
+        "repeat_until": "Until",
+        "repeat_count": "Occurrences",
+        "event_series": "Recurring events",
+        "part_of_series": "Part of a recurring series.",
+        "series_calendar": "Add the series to your calendar",
+        "too_many_attempts": "Too many attempts. Please wait a moment and try again.",
+        "server_busy": "The server is busy right now. Please try again in a moment.",
+        "notify_subject": "Volunteer Hub: {count} new update(s)",
+        "notify_greeting": "Hello {name},",
+        "notify_hours_approved": "{title} ({date}): {hours} hours approved.",
+        "notify_hours_rejected": "{title} ({date}): your submitted hours were not approved.",
+        "notify_event_updated": "{title}: details changed, now {date} at {location}.",
+        "notify_footer": "This is an automatic message from Volunteer Hub.",
+        "report_snapshot_note": "Data as of {time} UTC (from the latest backup snapshot).",
+        "import_users_too_many": "This file has more than {limit} rows. Use the flask import-users command for large files.",
+        "occurrence_started": "This occurrence has already started; registration is closed."
 
 
 
@@ -398,13 +1277,17 @@ def _(key):
     return TRANSLATIONS.get(get_lang(), {}).get(key, key)
 
 
-@app.context_processor
+@bp.app_context_processor
 def inject_i18n():
     """Make _() and current_lang available in all templates."""
-    return {"_": _, "current_lang": get_lang()}
+    show_panel = current_app.config["SQL_PANEL"]
+    if show_panel is None:
+        show_panel = current_app.debug
+    return {"_": _, "current_lang": get_lang(),
+            "sql_panel": sql_profile() if show_panel else None}
 
 
-@app.route("/lang/<lang_code>")
+@bp.route("/lang/<lang_code>")
 def set_language(lang_code):
     """Switch UI language between 'ar' and 'en' and redirect back."""
     lang_code = (lang_code or "ar").lower()
@@ -412,7 +1295,7 @@ def set_language(lang_code):
         lang_code = "ar"
     session["lang"] = lang_code
     flash(_("welcome"))
-    return redirect(request.referrer or url_for("home"))
+    return redirect(request.referrer or url_for("main.home"))
 
 
 # Auth & roles
@@ -429,8 +1312,8 @@ def login_required(view):
     def wrapped(*args, **kwargs):
         if "user_id" not in session:
             flash(_("need_login"))
-            return redirect(url_for("login", next=request.path))
-        return view(*args, **kwargs)
+            return redirect(url_for("main.login", next=request.path))
+        return current_app.ensure_sync(view)(*args, **kwargs)
     return wrapped
 
 
@@ -439,14 +1322,14 @@ def admin_required(view):
     def wrapped(*args, **kwargs):
         if session.get("role") != "admin":
             flash(_("admin_needed"))
-            return redirect(url_for("home"))
-        return view(*args, **kwargs)
+            return redirect(url_for("main.home"))
+        return current_app.ensure_sync(view)(*args, **kwargs)
     return wrapped
 
 
 # Filters
 
-@app.template_filter("fmt_dt")
+@bp.app_template_filter("fmt_dt")
 def format_datetime(value, fmt="%Y-%m-%d %H:%M"):
     if not value:
         return ""
@@ -459,9 +1342,158 @@ def format_datetime(value, fmt="%Y-%m-%d %H:%M"):
     return str(value)
 
 
+# Password hashing and auth rate limits
+
+class HashQueueFull(Exception):
+    """Raised by HashPool when the hashing queue is full."""
+
+
+class HashPool:
+    """Bounded thread pool for password hashing.
+
+    hashlib's scrypt and pbkdf2 release the GIL, so up to `workers` hashes run
+    in parallel while the other request threads keep their share of the CPU.
+    At most `max_queue` more may wait; past that, run() raises HashQueueFull
+    straight away so a burst of logins gets a quick 503 instead of tying up
+    every worker thread.
+    """
+
+    def __init__(self, workers=2, max_queue=32, metrics=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.metrics = metrics
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _timed(self, op, fn, args, queued_at):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe("password_hash_wait_seconds", started - queued_at, {"op": op})
+                self.metrics.observe("password_hash_seconds", time.perf_counter() - started, {"op": op})
+
+    def _take(self, op, n):
+        """Reserve `n` queue slots, or raise HashQueueFull holding none."""
+        for taken in range(n):
+            if not self._slots.acquire(blocking=False):
+                for _ in range(taken):
+                    self._slots.release()
+                if self.metrics is not None:
+                    self.metrics.inc("password_hash_rejected_total", {"op": op})
+                raise HashQueueFull(op)
+        with self._lock:
+            self.in_flight += n
+
+    def _give_back(self, n):
+        with self._lock:
+            self.in_flight -= n
+        for _ in range(n):
+            self._slots.release()
+
+    def run(self, op, fn, *args):
+        self._take(op, 1)
+        try:
+            return self.executor.submit(self._timed, op, fn, args, time.perf_counter()).result()
+        finally:
+            self._give_back(1)
+
+    def generate_many(self, passwords):
+        """Hash a small batch (the web user import), `workers` at a time.
+
+        Logins and sign-ups queued in between get their turn, so an upload
+        cannot hold the pool for its whole length.
+        """
+        hashes = []
+        for start in range(0, len(passwords), self.workers):
+            step = passwords[start:start + self.workers]
+            self._take("import", len(step))
+            try:
+                queued_at = time.perf_counter()
+                futures = [self.executor.submit(self._timed, "import", generate_password_hash, (pw,), queued_at)
+                           for pw in step]
+                hashes.extend(f.result() for f in futures)
+            finally:
+                self._give_back(len(step))
+        return hashes
+
+    def check(self, pwhash, password):
+        return self.run("check", check_password_hash, pwhash, password)
+
+    def generate(self, password):
+        return self.run("generate", generate_password_hash, password)
+
+
+def hash_pool():
+    return current_app.extensions["hash_pool"]
+
+
+class RateLimiter:
+    """In-memory token buckets, one per key (a client IP or an email).
+
+    A bucket holds up to `burst` tokens and refills at `per_minute`. Like the
+    metrics, state is per worker process. Once more than `max_keys` buckets
+    exist, the longest-idle half is dropped.
+    """
+
+    def __init__(self, burst, per_minute, max_keys=100_000):
+        self.burst = float(burst)
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Take one token for `key`. Returns 0 if allowed, else seconds until one is free."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune()
+                bucket = self._buckets[key] = [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                return 0.0
+            bucket[0] = tokens
+            return (1.0 - tokens) / self.rate if self.rate else 60.0
+
+    def _prune(self):
+        idle = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _bucket in idle[: len(idle) // 2 + 1]:
+            del self._buckets[key]
+
+
+def auth_rate_limited(email=None):
+    """Spend a login/register token for the client IP, then for the email.
+
+    Returns seconds to wait (0 when the attempt may go ahead).
+    """
+    limits = current_app.extensions["auth_limits"]
+    for scope, key in (("ip", request.remote_addr or "unknown"), ("email", email)):
+        limiter = limits.get(scope)
+        if limiter is None or not key:
+            continue
+        wait = limiter.hit(key)
+        if wait:
+            metrics().inc("auth_rate_limited_total", {"scope": scope, "endpoint": request.endpoint})
+            return wait
+    return 0.0
+
+
+def auth_refused(template, message, status, retry_after):
+    flash(message)
+    return render_template(template), status, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
 # Auth routes
 
-@app.route("/register", methods=["GET", "POST"])
+@bp.route("/register", methods=["GET", "POST"])
 def register():
     if request.method == "POST":
         name = request.form.get("name", "").strip()
@@ -471,88 +1503,221 @@ def register():
 
         if not name or not email or not password:
             flash("Please fill in all required fields.")
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
+
+        wait = auth_rate_limited(email)
+        if wait:
+            return auth_refused("register.html", _("too_many_attempts"), 429, wait)
 
         db = get_db()
+        # Don't spend a hash on an address that is already taken.
+        if db.execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone():
+            flash("This email is already registered.")
+            return redirect(url_for("main.register"))
+        try:
+            password_hash = hash_pool().generate(password)
+        except HashQueueFull:
+            return auth_refused("register.html", _("server_busy"), 503, 1)
         try:
             db.execute(
                 "INSERT INTO users (name, email, role, password_hash) VALUES (?, ?, ?, ?)",
-                (name, email, role, generate_password_hash(password)),
+                (name, email, role, password_hash),
             )
             db.commit()
         except sqlite3.IntegrityError:
             flash("This email is already registered.")
-            return redirect(url_for("register"))
+            return redirect(url_for("main.register"))
 
         flash(_("welcome"))
-        return redirect(url_for("login"))
+        return redirect(url_for("main.login"))
     return render_template("register.html")
 
 
-@app.route("/login", methods=["GET", "POST"])
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         email = request.form.get("email", "").strip().lower()
         password = request.form.get("password", "")
 
+        wait = auth_rate_limited(email)
+        if wait:
+            return auth_refused("login.html", _("too_many_attempts"), 429, wait)
+
         db = get_db()
         user = db.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
-        if user and check_password_hash(user["password_hash"], password):
+        try:
+            ok = user is not None and hash_pool().check(user["password_hash"], password)
+        except HashQueueFull:
+            return auth_refused("login.html", _("server_busy"), 503, 1)
+        if ok:
             session["user_id"] = user["id"]
             session["role"] = user["role"]
             flash(_("welcome"))
             next_url = request.args.get("next")
             if next_url and next_url.startswith("/"):
                 return redirect(next_url)
-            return redirect(url_for("home"))
+            return redirect(url_for("main.home"))
 
         flash("Invalid email or password.")
-        return redirect(url_for("login"))
+        return redirect(url_for("main.login"))
     return render_template("login.html")
 
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     session.clear()
     flash(_("welcome"))
-    return redirect(url_for("home"))
+    return redirect(url_for("main.home"))
 
 
 # Public pages
 
-@app.route("/")
-def home():
-    db = get_db()
-    events = db.execute("SELECT * FROM events ORDER BY date ASC").fetchall()
+# Read-only pages are async views over the ReadPool (see asgi.py).
+
+@bp.route("/")
+async def home():
+    events = await listing_with_series(read_db())
     return render_template("home.html", events=events)
 
 
-@app.route("/events")
-def events():
-    db = get_db()
-    events = db.execute("SELECT * FROM events ORDER BY date ASC").fetchall()
+@bp.route("/events")
+async def events():
+    events = await listing_with_series(read_db())
     return render_template("events.html", events=events)
 
 
-@app.route("/events/<int:event_id>")
-def event_detail(event_id: int):
-    db = get_db()
-    ev = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+# Events near a point
+
+EARTH_RADIUS_KM = 6371.0088
+NEARBY_MAX_KM = 500.0
+NEARBY_LIMIT = 100
+
+
+def parse_coordinates(lat, lng):
+    """Parse optional latitude/longitude strings.
+
+    Returns ((lat, lng), None), ((None, None), None) when both are blank,
+    or ((None, None), error message).
+    """
+    if not lat and not lng:
+        return (None, None), None
+    try:
+        lat_val, lng_val = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return (None, None), "Latitude and longitude must both be given as decimal degrees."
+    if not (-90.0 <= lat_val <= 90.0 and -180.0 <= lng_val <= 180.0):
+        return (None, None), "Latitude must be within ±90 and longitude within ±180."
+    return (lat_val, lng_val), None
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geo_bbox(lat, lng, km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing every point within km.
+
+    Near the poles, or where the box would cross the antimeridian, the
+    longitude range widens to the full circle; the haversine pass that
+    follows trims the extra candidates.
+    """
+    ang = km / EARTH_RADIUS_KM
+    dlat = math.degrees(ang)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0 or ang >= math.pi / 2:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    dlng = math.degrees(math.asin(min(1.0, math.sin(ang) / math.cos(math.radians(lat)))))
+    if lng - dlng < -180.0 or lng + dlng > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+NEARBY_SQL = """
+    SELECT e.*
+      FROM events_geo g
+      JOIN events e ON e.id = g.id
+     WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lng >= ? AND g.min_lng <= ?
+       AND COALESCE(e.end_dt, e.start_dt, e.date) >= ?
+"""
+
+
+@bp.route("/events/nearby")
+async def events_nearby():
+    """Upcoming events within ?km= of ?lat=&lng=.
+
+    The R*Tree returns candidates inside the bounding box; haversine keeps
+    those truly within range. Results follow the usual upcoming-date order,
+    or nearest first with ?sort=distance. ?format=json returns JSON.
+    """
+    want_json = request.args.get("format") == "json"
+    lat_arg, lng_arg = request.args.get("lat", "").strip(), request.args.get("lng", "").strip()
+    sort = "distance" if request.args.get("sort") == "distance" else "date"
+    (lat, lng), error = parse_coordinates(lat_arg, lng_arg)
+    try:
+        km = float(request.args.get("km") or 10)
+    except ValueError:
+        km = -1.0
+    if not error and not 0 < km <= NEARBY_MAX_KM:
+        error = f"Distance must be between 0 and {NEARBY_MAX_KM:g} km."
+    if not error and lat is None and want_json:
+        error = "lat and lng are required."
+
+    results = []
+    if not error and lat is not None:
+        rows = await read_db().aquery(
+            NEARBY_SQL, (*geo_bbox(lat, lng, km), datetime.now().strftime("%Y-%m-%d")))
+        for ev in rows:
+            dist = haversine_km(lat, lng, ev["lat"], ev["lng"])
+            if dist <= km:
+                results.append((ev, dist))
+        if sort == "distance":
+            results.sort(key=lambda item: (item[1], item[0]["date"]))
+        else:
+            results.sort(key=lambda item: (item[0]["date"], item[1]))
+        results = results[:NEARBY_LIMIT]
+
+    if want_json:
+        if error:
+            return jsonify({"error": error}), 400
+        return jsonify({
+            "lat": lat, "lng": lng, "km": km, "sort": sort,
+            "events": [{"id": ev["id"], "title": ev["title"], "start_dt": ev["start_dt"],
+                        "end_dt": ev["end_dt"], "location": ev["location"],
+                        "lat": ev["lat"], "lng": ev["lng"], "distance_km": round(dist, 2)}
+                       for ev, dist in results],
+        })
+    if error:
+        flash(error)
+    return render_template(
+        "events.html", events=[ev for ev, _d in results],
+        distances={ev["id"]: dist for ev, dist in results},
+        nearby={"lat": lat_arg, "lng": lng_arg, "km": f"{km:g}" if km > 0 else "10", "sort": sort},
+    )
+
+
+@bp.route("/events/<int:event_id>")
+async def event_detail(event_id: int):
+    db = read_db()
+    ev = await db.aquery("SELECT * FROM events WHERE id = ?", (event_id,), one=True)
     if not ev:
         flash(_("event_not_found"))
-        return redirect(url_for("events"))
+        return redirect(url_for("main.events"))
 
     reg = None
     if session.get("user_id"):
-        reg = db.execute(
+        reg = await db.aquery(
             "SELECT * FROM registrations WHERE user_id = ? AND event_id = ?",
-            (session["user_id"], event_id),
-        ).fetchone()
+            (session["user_id"], event_id), one=True,
+        )
 
-    counts = db.execute(
+    counts = await db.aquery(
         "SELECT COUNT(*) AS c FROM registrations WHERE event_id = ? AND status != 'cancelled'",
-        (event_id,),
-    ).fetchone()
+        (event_id,), one=True,
+    )
     total_registered = counts["c"] if counts else 0
 
     return render_template("event_detail.html", ev=ev, reg=reg, total_registered=total_registered)
@@ -561,14 +1726,62 @@ def event_detail(event_id: int):
 # Registration
 
 
-@app.route("/events/<int:event_id>/register", methods=["POST"])
+# Schedule conflicts. Two events overlap when each starts before the other
+# ends; events without start/end times never conflict.
+
+# Range probe on idx_events_ends: only events ending after the candidate
+# starts are read, i.e. the upcoming ones, however long the user's history.
+# Each is then checked against the (user_id, event_id) unique index.
+CONFLICTS_SQL = """
+    SELECT e.id, e.title, e.start_dt, e.end_dt
+      FROM events e
+     WHERE e.end_dt > ? AND e.start_dt < ? AND e.id IS NOT ?
+       AND EXISTS (SELECT 1 FROM registrations r
+                    WHERE r.user_id = ? AND r.event_id = e.id AND r.status != 'cancelled')
+     ORDER BY e.start_dt
+"""
+
+# Sweep over the user's registrations in start order: an event opens a new
+# group unless it starts before the latest end seen so far. Groups with more
+# than one event are the conflicts. One sort, no pairwise comparison. The
+# sweep needs every registration of the user anyway, so this one is driven
+# by idx_registrations_user rather than by event times.
+MY_CONFLICTS_SQL = """
+    WITH mine AS (
+        SELECT e.id, e.title, e.start_dt, e.end_dt, e.location
+          FROM registrations r
+          JOIN events e ON e.id = r.event_id
+         WHERE r.user_id = ? AND r.status != 'cancelled'
+           AND e.start_dt IS NOT NULL AND e.end_dt IS NOT NULL
+    ), swept AS (
+        SELECT *, MAX(end_dt) OVER (ORDER BY start_dt, id
+                                    ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS prev_end
+          FROM mine
+    ), grouped AS (
+        SELECT *, SUM(prev_end IS NULL OR start_dt >= prev_end) OVER (ORDER BY start_dt, id) AS grp
+          FROM swept
+    )
+    SELECT * FROM (SELECT *, COUNT(*) OVER (PARTITION BY grp) AS n FROM grouped)
+     WHERE n > 1
+     ORDER BY start_dt, id
+"""
+
+
+def find_conflicts(db, user_id, ev):
+    """The user's active registrations whose times overlap event `ev`."""
+    if not ev["start_dt"] or not ev["end_dt"]:
+        return []
+    return db.execute(CONFLICTS_SQL, (ev["start_dt"], ev["end_dt"], ev["id"], user_id)).fetchall()
+
+
+@bp.route("/events/<int:event_id>/register", methods=["POST"])
 @login_required
 def register_event(event_id: int):
     db = get_db()
     ev = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
     if not ev:
         flash(_("event_not_found"))
-        return redirect(url_for("events"))
+        return redirect(url_for("main.events"))
 
     base_hours = calc_event_hours(ev)
 
@@ -581,7 +1794,13 @@ def register_event(event_id: int):
         ).fetchone()["c"]
         if cnt >= ev["capacity"]:
             flash("This event has reached its capacity.")
-            return redirect(url_for("event_detail", event_id=event_id))
+            return redirect(url_for("main.event_detail", event_id=event_id))
+
+    clashes = find_conflicts(db, session["user_id"], ev)
+    if clashes:
+        count_action("register_conflict")
+        flash(_("conflict_blocked").format(titles=", ".join(c["title"] for c in clashes)))
+        return redirect(url_for("main.event_detail", event_id=event_id))
 
     try:
         db.execute(
@@ -589,14 +1808,15 @@ def register_event(event_id: int):
             (session["user_id"], event_id),
         )
         db.commit()
+        count_action("register")
         flash(_("registered_ok"))
     except sqlite3.IntegrityError:
         flash(_("already_registered"))
 
-    return redirect(url_for("event_detail", event_id=event_id, base_hours=base_hours, reg=reg))
+    return redirect(url_for("main.event_detail", event_id=event_id, base_hours=base_hours, reg=reg))
 
 
-@app.route("/events/<int:event_id>/submit_hours", methods=["POST"])
+@bp.route("/events/<int:event_id>/submit_hours", methods=["POST"])
 @login_required
 def submit_hours(event_id: int):
     db = get_db()
@@ -605,7 +1825,7 @@ def submit_hours(event_id: int):
     ev = db.execute("SELECT * FROM events WHERE id=?", (event_id,)).fetchone()
     if not ev:
         flash(_("event_not_found"))
-        return redirect(url_for("events"))
+        return redirect(url_for("main.events"))
 
     # Ensure user is registered for this event
     reg = db.execute(
@@ -614,7 +1834,7 @@ def submit_hours(event_id: int):
     ).fetchone()
     if not reg:
         flash(_("not_registered_for_event"))
-        return redirect(url_for("event_detail", event_id=event_id))
+        return redirect(url_for("main.event_detail", event_id=event_id))
 
     # Read form
     extra_hours = request.form.get("extra_hours", "").strip()
@@ -647,12 +1867,13 @@ def submit_hours(event_id: int):
         (self_hours, extra_val, extra_desc, now, reg["id"])
     )
     db.commit()
+    count_action("submit_hours")
 
     flash(_("hours_submitted_ok"))
-    return redirect(url_for("event_detail", event_id=event_id))
+    return redirect(url_for("main.event_detail", event_id=event_id))
 
 
-@app.route("/events/<int:event_id>/cancel", methods=["POST"])
+@bp.route("/events/<int:event_id>/cancel", methods=["POST"])
 @login_required
 def cancel_registration(event_id: int):
     db = get_db()
@@ -661,21 +1882,22 @@ def cancel_registration(event_id: int):
         (session["user_id"], event_id),
     )
     db.commit()
+    count_action("cancel")
     flash(_("cancelled_ok"))
-    return redirect(url_for("event_detail", event_id=event_id))
+    return redirect(url_for("main.event_detail", event_id=event_id))
 
 
 # Dashboards
 
-@app.route("/dashboard")
+@bp.route("/dashboard")
 @login_required
 def dashboard_volunteer():
-    db = get_db()
+    db = history_db()
     regs = db.execute(
         """
         SELECT r.*, e.title, e.date, e.location
-        FROM registrations r
-        JOIN events e ON e.id = r.event_id
+        FROM all_registrations r
+        JOIN all_events e ON e.id = r.event_id
         WHERE r.user_id = ?
         ORDER BY e.date DESC
         """,
@@ -683,21 +1905,31 @@ def dashboard_volunteer():
     ).fetchall()
 
     total_hours = db.execute(
-        "SELECT COALESCE(SUM(hours), 0) AS h FROM registrations WHERE user_id = ?",
+        "SELECT COALESCE(SUM(hours), 0) AS h FROM all_registrations WHERE user_id = ?",
         (session["user_id"],),
     ).fetchone()["h"]
 
     return render_template("dashboard_volunteer.html", regs=regs, total_hours=total_hours)
 
 
-@app.route("/admin")
+@bp.route("/dashboard/conflicts")
+@login_required
+def my_conflicts():
+    rows = get_db().execute(MY_CONFLICTS_SQL, (session["user_id"],)).fetchall()
+    groups = [list(items) for _grp, items in groupby(rows, key=lambda r: r["grp"])]
+    return render_template("conflicts.html", groups=groups)
+
+
+@bp.route("/admin")
 @admin_required
 def dashboard_admin():
     db = get_db()
     stats = {
         "volunteers": db.execute("SELECT COUNT(*) AS c FROM users WHERE role = 'volunteer'").fetchone()["c"],
         "events": db.execute("SELECT COUNT(*) AS c FROM events").fetchone()["c"],
-        "hours": db.execute("SELECT COALESCE(SUM(hours), 0) AS h FROM registrations").fetchone()["h"],
+        # Rollups include archived registrations and avoid a full scan.
+        "hours": db.execute(
+            "SELECT COALESCE(SUM(hours), 0) AS h FROM report_rollups WHERE dim = 'all'").fetchone()["h"],
     }
 
     latest_regs = db.execute(
@@ -713,6 +1945,7 @@ def dashboard_admin():
 
     events = db.execute(
         "SELECT * FROM events ORDER BY start_dt ASC NULLS LAST, date ASC LIMIT 50").fetchall()
+    series = db.execute("SELECT * FROM event_series ORDER BY start_dt ASC").fetchall()
 
     pending = db.execute(
         """
@@ -726,17 +1959,18 @@ def dashboard_admin():
     ).fetchall()
 
     return render_template("dashboard_admin.html",
-                           stats=stats, latest_regs=latest_regs, events=events, pending=pending)
+                           stats=stats, latest_regs=latest_regs, events=events, pending=pending,
+                           series=series)
 
 
-@app.route("/admin/registrations/<int:reg_id>/approve", methods=["POST"])
+@bp.route("/admin/registrations/<int:reg_id>/approve", methods=["POST"])
 @admin_required
 def approve_hours(reg_id: int):
     db = get_db()
     r = db.execute("SELECT * FROM registrations WHERE id=?", (reg_id,)).fetchone()
     if not r:
         flash(_("not_found"))
-        return redirect(url_for("dashboard_admin"))
+        return redirect(url_for("main.dashboard_admin"))
 
     total = (r["self_hours"] or 0.0) + (r["extra_hours"] or 0.0)
     now = datetime.utcnow().strftime("%Y-%m-%d %H:%M")
@@ -752,12 +1986,14 @@ def approve_hours(reg_id: int):
         """,
         (total, session["user_id"], now, total, reg_id)
     )
+    notify_registration(db, reg_id, "hours_approved", hours=total)
     db.commit()
+    count_action("approve_hours")
     flash(_("hours_approved_ok"))
-    return redirect(url_for("dashboard_admin"))
+    return redirect(url_for("main.dashboard_admin"))
 
 
-@app.route("/admin/hours/<int:reg_id>/reject", methods=["POST"])
+@bp.route("/admin/hours/<int:reg_id>/reject", methods=["POST"])
 @admin_required
 def reject_hours(reg_id: int):
     db = get_db()
@@ -774,15 +2010,17 @@ def reject_hours(reg_id: int):
 
          WHERE id = ?
     """, (reg_id,))
+    notify_registration(db, reg_id, "hours_rejected")
     db.commit()
+    count_action("reject_hours")
     flash(_("hours_rejected_ok"))
-    return redirect(url_for("dashboard_admin"))
+    return redirect(url_for("main.dashboard_admin"))
 
 
-@app.route("/admin/export_hours")
+@bp.route("/admin/export_hours")
 @admin_required
 def export_hours():
-    db = get_db()
+    db = report_db()
     rows = db.execute(
         """
         SELECT u.name AS volunteer,
@@ -795,9 +2033,9 @@ def export_hours():
                r.extra_desc,
                r.approved_hours,
                r.approved_at
-          FROM registrations r
+          FROM all_registrations r
           JOIN users u ON u.id=r.user_id
-          JOIN events e ON e.id=r.event_id
+          JOIN all_events e ON e.id=r.event_id
          WHERE r.approved_hours IS NOT NULL
          ORDER BY r.approved_at DESC
         """
@@ -830,20 +2068,30 @@ def export_hours():
     )
 
 
-@app.route("/admin/events/create", methods=["POST"])
-@admin_required
-def create_event():
-    f = request.form
-    title = (f.get("title") or "").strip()
-    start_dt = (f.get("start_dt") or "").strip()
-    end_dt = (f.get("end_dt") or "").strip()
-    location = (f.get("location") or "").strip()
-    description = (f.get("description") or "").strip() or None
-    capacity = (f.get("capacity") or "").strip()
+EVENT_INSERT_SQL = """
+    INSERT INTO events (title, description, start_dt, end_dt, location, capacity, created_by, date, lat, lng)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def validate_event_fields(f):
+    """Check create-event fields from a form or a dict.
+
+    Returns (values, None) on success, where values holds the cleaned
+    fields plus the duration in hours, or (None, error message).
+    """
+    def text(key):
+        return str(f.get(key) or "").strip()
+
+    title = text("title")
+    start_dt = text("start_dt").replace(" ", "T")
+    end_dt = text("end_dt").replace(" ", "T")
+    location = text("location")
+    description = text("description") or None
+    capacity = text("capacity")
 
     if not title or not start_dt or not end_dt or not location:
-        flash("Title, start time, end time, and location are required.")
-        return redirect(url_for("dashboard_admin"))
+        return None, "Title, start time, end time, and location are required."
 
     fmt = "%Y-%m-%dT%H:%M"
 
@@ -851,46 +2099,527 @@ def create_event():
         start = datetime.strptime(start_dt, fmt)
         end = datetime.strptime(end_dt, fmt)
     except ValueError:
-
-        flash("Invalid date format. Use browser datetime picker (YYYY-MM-DDTHH:MM).")
-        return redirect(url_for("dashboard_admin"))
+        return None, "Invalid date format. Use browser datetime picker (YYYY-MM-DDTHH:MM)."
 
     if end <= start:
-        flash("End time must be after start time.")
-        return redirect(url_for("dashboard_admin"))
+        return None, "End time must be after start time."
+
+    capacity_val = None
+    if capacity:
+        if not capacity.isdigit() or int(capacity) < 1:
+            return None, "Capacity must be a whole number of at least 1."
+        capacity_val = int(capacity)
+
+    (lat, lng), error = parse_coordinates(text("lat"), text("lng"))
+    if error:
+        return None, error
 
-    duration_hours = (end - start).total_seconds() / 3600.0
+    return {
+        "title": title, "description": description, "start_dt": start_dt, "end_dt": end_dt,
+        "location": location, "capacity": capacity_val, "lat": lat, "lng": lng,
+        "hours": (end - start).total_seconds() / 3600.0,
+    }, None
 
-    capacity_val = int(capacity) if capacity.isdigit() else None
+
+def event_insert_params(values, created_by):
+    return (values["title"], values["description"], values["start_dt"], values["end_dt"],
+            values["location"], values["capacity"], created_by, values["start_dt"],
+            values["lat"], values["lng"])
+
+
+@bp.route("/admin/events/create", methods=["POST"])
+@admin_required
+def create_event():
+    values, error = validate_event_fields(request.form)
+    if not error:
+        rule, error = validate_series_rule(request.form, values)
+    if error:
+        flash(error)
+        return redirect(url_for("main.dashboard_admin"))
 
     db = get_db()
+    if rule:
+        db.execute(SERIES_INSERT_SQL, series_insert_params(values, rule, session["user_id"]))
+        db.commit()
+        flash(_("series_created").format(title=values["title"]))
+        return redirect(url_for("main.dashboard_admin"))
+
+    db.execute(EVENT_INSERT_SQL, event_insert_params(values, session["user_id"]))
+    db.commit()
+
+    flash(_("event_created_duration").format(title=values["title"], hours=values["hours"]))
+
+    return redirect(url_for("main.dashboard_admin"))
+
+
+# Event series
+
+SERIES_STEPS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+SERIES_DT_FMT = "%Y-%m-%dT%H:%M"
+
+SERIES_INSERT_SQL = """
+    INSERT INTO event_series (title, description, location, capacity, lat, lng, start_dt, end_dt,
+                              freq, interval, until, count, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Series that may have occurrences starting in [window start, window end).
+SERIES_WINDOW_SQL = """
+    SELECT * FROM event_series
+     WHERE start_dt < ? AND (until IS NULL OR until >= ?)
+"""
+
+
+def validate_series_rule(f, values):
+    """Check the optional repeat fields of the create-event form.
+
+    Returns (None, None) for a one-off event, (rule, None) for a series,
+    or (None, error message).
+    """
+    freq = str(f.get("repeat") or "").strip()
+    if not freq:
+        return None, None
+    if freq not in SERIES_STEPS:
+        return None, "Repeat must be daily or weekly."
+    interval = str(f.get("repeat_interval") or "1").strip()
+    until = str(f.get("repeat_until") or "").strip() or None
+    count = str(f.get("repeat_count") or "").strip() or None
+    if not interval.isdigit() or int(interval) < 1:
+        return None, "Repeat interval must be a whole number of at least 1."
+    if until is None and count is None:
+        return None, "A repeating event needs an end date or a number of occurrences."
+    if until is not None:
+        try:
+            until_day = datetime.strptime(until, "%Y-%m-%d")
+        except ValueError:
+            return None, "Repeat end date must be YYYY-MM-DD."
+        if until_day.date() < datetime.strptime(values["start_dt"], SERIES_DT_FMT).date():
+            return None, "Repeat end date is before the first occurrence."
+    if count is not None and (not count.isdigit() or int(count) < 1):
+        return None, "Number of occurrences must be a whole number of at least 1."
+    return {"freq": freq, "interval": int(interval), "until": until,
+            "count": int(count) if count else None}, None
+
+
+def series_insert_params(values, rule, created_by):
+    return (values["title"], values["description"], values["location"], values["capacity"],
+            values["lat"], values["lng"], values["start_dt"], values["end_dt"],
+            rule["freq"], rule["interval"], rule["until"], rule["count"], created_by)
+
+
+def series_occurrences(series, window_start, window_end):
+    """Occurrences of `series` starting in [window_start, window_end).
+
+    Each one is a dict shaped like an events row with id None. The first
+    index in the window is computed directly, so cost depends only on the
+    window, not on how long the series has been running.
+    """
+    first = datetime.strptime(series["start_dt"], SERIES_DT_FMT)
+    length = datetime.strptime(series["end_dt"], SERIES_DT_FMT) - first
+    step = SERIES_STEPS[series["freq"]] * series["interval"]
+    until = datetime.strptime(series["until"], "%Y-%m-%d") + timedelta(days=1) if series["until"] else None
+    k = max(0, -((first - window_start) // step))
+    while series["count"] is None or k < series["count"]:
+        start = first + k * step
+        if start >= window_end or (until and start >= until):
+            break
+        start_s = start.strftime(SERIES_DT_FMT)
+        yield {
+            "id": None, "series_id": series["id"], "title": series["title"],
+            "description": series["description"], "date": start_s, "location": series["location"],
+            "capacity": series["capacity"], "created_by": series["created_by"],
+            "start_dt": start_s, "end_dt": (start + length).strftime(SERIES_DT_FMT),
+            "lat": series["lat"], "lng": series["lng"],
+        }
+        k += 1
+
+
+def find_occurrence(series, start_s):
+    """The occurrence of `series` starting exactly at start_s, or None."""
+    try:
+        start = datetime.strptime(start_s, SERIES_DT_FMT)
+    except ValueError:
+        return None
+    return next(series_occurrences(series, start, start + timedelta(minutes=1)), None)
+
+
+async def listing_with_series(db):
+    """All events in date order, plus upcoming series occurrences.
+
+    Occurrences are expanded only for the next SERIES_HORIZON_DAYS; ones that
+    already have an events row (someone registered) are not listed twice.
+    """
+    now = datetime.now().replace(second=0, microsecond=0)
+    horizon = now + timedelta(days=current_app.config["SERIES_HORIZON_DAYS"])
+    events = await db.aquery("SELECT * FROM events ORDER BY date ASC")
+    series = await db.aquery(SERIES_WINDOW_SQL, (horizon.strftime(SERIES_DT_FMT), now.strftime("%Y-%m-%d")))
+    if not series:
+        return events
+    materialized = {(ev["series_id"], ev["start_dt"]) for ev in events if ev["series_id"]}
+    occurrences = sorted(
+        (occ for s in series for occ in series_occurrences(s, now, horizon)
+         if (s["id"], occ["start_dt"]) not in materialized),
+        key=lambda occ: occ["date"])
+    return list(heapq.merge(events, occurrences, key=lambda ev: ev["date"]))
+
+
+@bp.app_template_global()
+def event_url(ev):
+    """Detail URL for an events row or a not-yet-materialized occurrence."""
+    if ev["id"] is None:
+        return url_for("main.occurrence_detail", series_id=ev["series_id"], start=ev["start_dt"])
+    return url_for("main.event_detail", event_id=ev["id"])
+
+
+@bp.route("/series/<int:series_id>/<start>")
+async def occurrence_detail(series_id: int, start: str):
+    db = read_db()
+    series = await db.aquery("SELECT * FROM event_series WHERE id = ?", (series_id,), one=True)
+    occ = find_occurrence(series, start) if series else None
+    if not occ:
+        flash(_("event_not_found"))
+        return redirect(url_for("main.events"))
+    ev = await db.aquery("SELECT id FROM events WHERE series_id = ? AND start_dt = ?",
+                         (series_id, occ["start_dt"]), one=True)
+    if ev:
+        return redirect(url_for("main.event_detail", event_id=ev["id"]))
+    return render_template("event_detail.html", ev=occ, reg=None, total_registered=0)
+
+
+def materialize_occurrence(db, occ):
+    """Insert the events row for an occurrence (if missing) and return its id."""
     db.execute(
         """
-        INSERT INTO events (title, description, start_dt, end_dt, location, capacity, created_by, date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT OR IGNORE INTO events (title, description, start_dt, end_dt, location, capacity,
+                                      created_by, date, lat, lng, series_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (title, description, start_dt, end_dt, location,
-         capacity_val, session["user_id"], start_dt),
-    )
+        (occ["title"], occ["description"], occ["start_dt"], occ["end_dt"], occ["location"],
+         occ["capacity"], occ["created_by"], occ["date"], occ["lat"], occ["lng"], occ["series_id"]))
+    return db.execute("SELECT id FROM events WHERE series_id = ? AND start_dt = ?",
+                      (occ["series_id"], occ["start_dt"])).fetchone()["id"]
+
+
+@bp.route("/series/<int:series_id>/<start>/register", methods=["POST"])
+@login_required
+def register_occurrence(series_id: int, start: str):
+    db = get_db()
+    series = db.execute("SELECT * FROM event_series WHERE id = ?", (series_id,)).fetchone()
+    occ = find_occurrence(series, start) if series else None
+    if not occ:
+        flash(_("event_not_found"))
+        return redirect(url_for("main.events"))
+    ev = db.execute("SELECT id FROM events WHERE series_id = ? AND start_dt = ?",
+                    (series_id, occ["start_dt"])).fetchone()
+    if ev:
+        return register_event(ev["id"])
+    # Only upcoming occurrences get an events row; otherwise any past date in
+    # the series could be materialized from a hand-written URL.
+    if occ["start_dt"] <= datetime.now().strftime(SERIES_DT_FMT):
+        flash(_("occurrence_started"))
+        return redirect(url_for("main.events"))
+    # Refuse before materializing, so a clash doesn't leave an empty events row.
+    clashes = find_conflicts(db, session["user_id"], occ)
+    if clashes:
+        count_action("register_conflict")
+        flash(_("conflict_blocked").format(titles=", ".join(c["title"] for c in clashes)))
+        return redirect(url_for("main.occurrence_detail", series_id=series_id, start=start))
+    event_id = materialize_occurrence(db, occ)
     db.commit()
+    return register_event(event_id)
+
+
+@bp.route("/series/<int:series_id>/ics")
+async def series_ics(series_id: int):
+    """The whole series as one recurring VEVENT (RRULE), for calendar apps."""
+    series = await read_db().aquery("SELECT * FROM event_series WHERE id = ?", (series_id,), one=True)
+    if not series:
+        flash(_("event_not_found"))
+        return redirect(url_for("main.events"))
+    start = datetime.strptime(series["start_dt"], SERIES_DT_FMT)
+    end = datetime.strptime(series["end_dt"], SERIES_DT_FMT)
+    rrule = f"RRULE:FREQ={series['freq'].upper()};INTERVAL={series['interval']}"
+    if series["count"]:
+        rrule += f";COUNT={series['count']}"
+    if series["until"]:
+        rrule += ";UNTIL=" + series["until"].replace("-", "") + "T235959"
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//VolunteerHub//EN", "BEGIN:VEVENT",
+             "DTSTART:" + start.strftime("%Y%m%dT%H%M%S"), "DTEND:" + end.strftime("%Y%m%dT%H%M%S"),
+             rrule, f"UID:series-{series_id}@volunteer-hub", f"SUMMARY:{series['title']}",
+             f"LOCATION:{series['location']}", "END:VEVENT", "END:VCALENDAR"]
+    return Response("\r\n".join(lines), mimetype="text/calendar",
+                    headers={"Content-Disposition": f"attachment; filename=series_{series_id}.ics"})
+
+
+@bp.route("/admin/series/<int:series_id>/delete", methods=["POST"])
+@admin_required
+def delete_series(series_id: int):
+    """Stop a series. Occurrences people already registered for stay as events."""
+    db = get_db()
+    db.execute("DELETE FROM event_series WHERE id = ?", (series_id,))
+    db.commit()
+    flash(_("series_deleted"))
+    return redirect(url_for("main.dashboard_admin"))
+
+
+# Bulk import
+
+IMPORT_CHUNK = 500
+
+
+def chunk_failed(db, report, lines, error):
+    """Roll back a chunk whose insert failed and report its whole line range.
+
+    Earlier chunks are already committed, so the import keeps going and the
+    caller still gets a report instead of a 500.
+    """
+    db.rollback()
+    report["rejected"] += len(lines)
+    span = str(lines[0]) if lines[0] == lines[-1] else f"{lines[0]}-{lines[-1]}"
+    report["errors"].append({"line": span, "error": f"Not imported: {error}"})
+
+
+def iter_import_rows(stream, fmt):
+    """Yield (line number, dict or None) from a CSV or JSON-lines byte stream.
+
+    None means the line could not be parsed. The stream is read
+    incrementally, never loaded whole.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "jsonl":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else None
+    else:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def import_format(filename, explicit=None):
+    if explicit:
+        return explicit
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def import_events(db, rows, created_by=None, chunk_size=IMPORT_CHUNK):
+    """Validate rows like create_event() and insert them in chunked transactions.
+
+    `rows` yields (line number, dict). Invalid rows are skipped and
+    reported; every chunk of valid rows is one executemany + commit, and a
+    chunk the database refuses is reported as a whole (see chunk_failed).
+    """
+    started = time.perf_counter()
+    report = {"inserted": 0, "rejected": 0, "errors": []}
+    batch, lines = [], []
 
-    flash(_("event_created_duration").format(title=title, hours=duration_hours))
+    def flush():
+        try:
+            db.executemany(EVENT_INSERT_SQL, batch)
+            db.commit()
+        except sqlite3.Error as e:
+            chunk_failed(db, report, lines, e)
+        else:
+            report["inserted"] += len(batch)
+        batch.clear()
+        lines.clear()
 
-    return redirect(url_for("dashboard_admin"))
+    for line_no, row in rows:
+        if row is None:
+            values, error = None, "Could not parse this line."
+        else:
+            values, error = validate_event_fields(row)
+        if error:
+            report["rejected"] += 1
+            report["errors"].append({"line": line_no, "error": error})
+            continue
+        batch.append(event_insert_params(values, created_by))
+        lines.append(line_no)
+        if len(batch) >= chunk_size:
+            flush()
+    if batch:
+        flush()
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+@bp.route("/admin/events/import", methods=["POST"])
+@admin_required
+def import_events_upload():
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash(_("import_choose_file"))
+        return redirect(url_for("main.dashboard_admin"))
+
+    fmt = import_format(upload.filename, request.form.get("format"))
+    report = import_events(get_db(), iter_import_rows(upload.stream, fmt), session["user_id"])
+    if report["inserted"]:
+        count_action("import_events", report["inserted"])
+
+    if request.args.get("format") == "json":
+        return jsonify(report)
+    return render_template("import_report.html", report=report, kind=_("import_events"))
+
+
+@click.command("import-events")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+              help="Defaults to the file extension.")
+@click.option("--created-by", type=int, default=None, help="User id recorded as the creator.")
+@with_appcontext
+def import_events_command(path, fmt, created_by):
+    """CLI: flask --app app.py import-events events.csv"""
+    with open(path, "rb") as f:
+        report = import_events(get_db(), iter_import_rows(f, import_format(path, fmt)), created_by)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+USER_IMPORT_CHUNK = 1000
+
+
+def import_users(db, rows, workers=None, chunk_size=USER_IMPORT_CHUNK, hasher=None):
+    """Bulk-create accounts, hashing passwords across a process pool.
+
+    `rows` yields (line number, dict) with name, email, password and an
+    optional role (default volunteer). Emails are de-duplicated in memory
+    against users.email and the file itself before any hashing is done.
+    With `hasher` (the app's HashPool) passwords are hashed there instead,
+    so a web request never starts processes.
+    Each chunk is hashed in parallel, then inserted in one transaction; if
+    that fails (e.g. the same email was just registered), the chunk is
+    reported as rejected and the import goes on.
+    """
+    started = time.perf_counter()
+    report = {"inserted": 0, "rejected": 0, "errors": [],
+              "workers": hasher.workers if hasher else workers or os.cpu_count(),
+              "hash_seconds": 0.0, "insert_seconds": 0.0}
+    seen = {r[0] for r in db.execute("SELECT email FROM users")}
+    batch, lines = [], []
+
+    def reject(line_no, error):
+        report["rejected"] += 1
+        report["errors"].append({"line": line_no, "error": error})
+
+    def flush(hash_all):
+        t0 = time.perf_counter()
+        hashes = hash_all([b[3] for b in batch])
+        t1 = time.perf_counter()
+        try:
+            db.executemany(
+                "INSERT INTO users (name, email, role, password_hash) VALUES (?, ?, ?, ?)",
+                [(name, email, role, h) for (name, email, role, _pw), h in zip(batch, hashes)],
+            )
+            db.commit()
+        except sqlite3.Error as e:
+            chunk_failed(db, report, lines, e)
+        else:
+            report["inserted"] += len(batch)
+        report["hash_seconds"] += t1 - t0
+        report["insert_seconds"] += time.perf_counter() - t1
+        batch.clear()
+        lines.clear()
+
+    def consume(hash_all):
+        for line_no, row in rows:
+            if row is None:
+                reject(line_no, "Could not parse this line.")
+                continue
+            name = str(row.get("name") or "").strip()
+            email = str(row.get("email") or "").strip().lower()
+            password = str(row.get("password") or "")
+            role = str(row.get("role") or "volunteer").strip().lower()
+            if not name or not email or not password:
+                reject(line_no, "Please fill in all required fields.")
+            elif role not in ("volunteer", "admin"):
+                reject(line_no, "Role must be volunteer or admin.")
+            elif email in seen:
+                reject(line_no, "This email is already registered.")
+            else:
+                seen.add(email)
+                batch.append((name, email, role, password))
+                lines.append(line_no)
+                if len(batch) >= chunk_size:
+                    flush(hash_all)
+        if batch:
+            flush(hash_all)
+
+    if hasher is not None:
+        consume(hasher.generate_many)
+    else:
+        # spawn, not fork: the parent may be a threaded web worker.
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            consume(lambda passwords: list(pool.map(generate_password_hash, passwords, chunksize=16)))
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    report["hash_seconds"] = round(report["hash_seconds"], 3)
+    report["insert_seconds"] = round(report["insert_seconds"], 3)
+    report["users_per_second"] = round(report["inserted"] / report["seconds"], 1) if report["seconds"] else 0.0
+    return report
+
+
+@bp.route("/admin/users/import", methods=["POST"])
+@admin_required
+def import_users_upload():
+    """Small batches only, hashed on the app's HashPool. Use the CLI for big files."""
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash(_("import_choose_file"))
+        return redirect(url_for("main.dashboard_admin"))
+
+    want_json = request.args.get("format") == "json"
+    limit = current_app.config["IMPORT_USERS_WEB_MAX"]
+    fmt = import_format(upload.filename, request.form.get("format"))
+    rows = list(islice(iter_import_rows(upload.stream, fmt), limit + 1))
+    if len(rows) > limit:
+        message = _("import_users_too_many").format(limit=limit)
+        if want_json:
+            return jsonify({"error": message}), 413
+        flash(message)
+        return redirect(url_for("main.dashboard_admin"))
+    try:
+        report = import_users(get_db(), rows, hasher=hash_pool())
+    except HashQueueFull:
+        if want_json:
+            return jsonify({"error": _("server_busy")}), 503, {"Retry-After": "1"}
+        flash(_("server_busy"))
+        return redirect(url_for("main.dashboard_admin"))
+    if want_json:
+        return jsonify(report)
+    return render_template("import_report.html", report=report, kind=_("import_users"))
+
+
+@click.command("import-users")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+              help="Defaults to the file extension.")
+@click.option("--workers", type=int, default=None, help="Hashing processes (default: CPU count).")
+@with_appcontext
+def import_users_command(path, fmt, workers):
+    """CLI: flask --app app.py import-users volunteers.csv --workers 8"""
+    with open(path, "rb") as f:
+        report = import_users(get_db(), iter_import_rows(f, import_format(path, fmt)),
+                              workers or current_app.config["IMPORT_HASH_WORKERS"])
+    print(json.dumps(report, indent=2, ensure_ascii=False))
 
 
 def admin_required_view():
     if session.get("role") != "admin":
         flash(_("admin_needed"))
-        return redirect(url_for("home"))
+        return redirect(url_for("main.home"))
 
 
-@app.route("/admin/events/<int:event_id>/edit", methods=["GET"])
+@bp.route("/admin/events/<int:event_id>/edit", methods=["GET"])
 def edit_event_form(event_id):
     # Admin check
     if session.get("role") != "admin":
         flash(_("admin_needed"))
-        return redirect(url_for("home"))
+        return redirect(url_for("main.home"))
 
     db = get_db()
     ev = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
@@ -899,47 +2628,43 @@ def edit_event_form(event_id):
     return render_template("event_edit.html", ev=ev)
 
 
-@app.route("/admin/events/<int:event_id>/edit", methods=["POST"])
+@bp.route("/admin/events/<int:event_id>/edit", methods=["POST"])
 def edit_event_submit(event_id):
     # Admin check
     if session.get("role") != "admin":
         flash(_("admin_needed"))
-        return redirect(url_for("home"))
-
-    title = request.form.get("title", "").strip()
-    description = request.form.get("description", "").strip()
-    date = request.form.get("date", "").strip()      # "YYYY-MM-DD HH:MM"
-    location = request.form.get("location", "").strip()
-    capacity = request.form.get("capacity", "").strip()
+        return redirect(url_for("main.home"))
 
-    if not title or not date or not location:
-        flash(_("not_found"))
-        return redirect(url_for("edit_event_form", event_id=event_id))
-
-    cap_val = None
-    if capacity:
-        try:
-            cap_val = int(capacity)
-        except ValueError:
-            cap_val = None
+    # Same rules as the create form; start/end drive date too, as they do there.
+    values, error = validate_event_fields(request.form)
+    if error:
+        flash(error)
+        return redirect(url_for("main.edit_event_form", event_id=event_id))
 
     db = get_db()
+    old = db.execute("SELECT title, start_dt, end_dt, location FROM events WHERE id = ?", (event_id,)).fetchone()
     db.execute("""
         UPDATE events
-           SET title = ?, description = ?, date = ?, location = ?, capacity = ?
+           SET title = ?, description = ?, start_dt = ?, end_dt = ?, date = ?, location = ?, capacity = ?,
+               lat = ?, lng = ?
          WHERE id = ?
-    """, (title, description, date, location, cap_val, event_id))
+    """, (values["title"], values["description"], values["start_dt"], values["end_dt"], values["start_dt"],
+          values["location"], values["capacity"], values["lat"], values["lng"], event_id))
+    # Only changes a volunteer has to act on are worth a mail.
+    new = (values["title"], values["start_dt"], values["end_dt"], values["location"])
+    if old and tuple(old) != new:
+        notify_event(db, event_id, "event_updated")
     db.commit()
 
     flash(_("event_updated"))
-    return redirect(url_for("dashboard_admin"))
+    return redirect(url_for("main.dashboard_admin"))
 
 
-@app.route("/admin/events/<int:event_id>/delete", methods=["POST"])
+@bp.route("/admin/events/<int:event_id>/delete", methods=["POST"])
 def delete_event(event_id):
     if session.get("role") != "admin":
         flash(_("admin_needed"))
-        return redirect(url_for("home"))
+        return redirect(url_for("main.home"))
 
     db = get_db()
 
@@ -948,10 +2673,10 @@ def delete_event(event_id):
     db.execute("DELETE FROM events WHERE id = ?", (event_id,))
     db.commit()
     flash("Event deleted successfully.")
-    return redirect(url_for("dashboard_admin"))
+    return redirect(url_for("main.dashboard_admin"))
 
 
-@app.route("/admin/registrations/<int:reg_id>/mark", methods=["POST"])
+@bp.route("/admin/registrations/<int:reg_id>/mark", methods=["POST"])
 @admin_required
 def mark_attendance(reg_id: int):
     status = request.form.get("status", "registered").strip()
@@ -966,60 +2691,920 @@ def mark_attendance(reg_id: int):
     db.execute("UPDATE registrations SET status = ?, hours = ? WHERE id = ?", (status, hours, reg_id))
     db.commit()
     flash(_("reg_updated"))
-    return redirect(url_for("dashboard_admin"))
+    return redirect(url_for("main.dashboard_admin"))
+
+
+# Notifications. Routes queue rows in the notifications outbox inside their
+# own transaction, so a change that rolls back never mails anyone and no
+# admin action waits on SMTP. `flask send-notifications` later groups each
+# volunteer's pending rows into one digest and sends it over SmtpPool.
+
+NOTIFY_SQL = """
+    INSERT INTO notifications (user_id, kind, event_id, payload, next_attempt_at)
+    SELECT r.user_id, ?, r.event_id,
+           json_patch(json_object('title', e.title,
+                                  'date', replace(COALESCE(e.start_dt, e.date), 'T', ' '),
+                                  'location', e.location), ?),
+           datetime('now', ?)
+      FROM registrations r
+      JOIN events e ON e.id = r.event_id
+     WHERE {where}
+"""
+
+# Every pending row of up to `batch` volunteers that have something due.
+DUE_DIGESTS_SQL = """
+    SELECT n.id, n.user_id, n.kind, n.event_id, n.payload, n.attempts, u.name, u.email
+      FROM notifications n
+      JOIN users u ON u.id = n.user_id
+     WHERE n.status = 'pending'
+       AND n.user_id IN (SELECT user_id FROM notifications
+                          WHERE status = 'pending' AND next_attempt_at <= ?
+                          GROUP BY user_id LIMIT ?)
+     ORDER BY n.user_id, n.id
+"""
+
+# Digest line per kind (TRANSLATIONS key); fields come from the payload.
+NOTIFY_LINES = {
+    "hours_approved": "notify_hours_approved",
+    "hours_rejected": "notify_hours_rejected",
+    "event_updated": "notify_event_updated",
+}
+
+
+def _queue_notifications(db, where, params, kind, payload):
+    # Held back for NOTIFY_DIGEST_DELAY so a burst of admin actions makes one mail.
+    delay = f"+{int(current_app.config['NOTIFY_DIGEST_DELAY'])} seconds"
+    db.execute(NOTIFY_SQL.format(where=where), (kind, json.dumps(payload), delay, *params))
+
+
+def notify_registration(db, reg_id, kind, **payload):
+    """Queue `kind` for the volunteer behind one registration. The caller commits."""
+    _queue_notifications(db, "r.id = ?", (reg_id,), kind, payload)
+
+
+def notify_event(db, event_id, kind, **payload):
+    """Queue `kind` for everyone still registered for an event. The caller commits."""
+    _queue_notifications(db, "r.event_id = ? AND r.status = 'registered'", (event_id,), kind, payload)
+
+
+def build_digest(rows, lang, sender):
+    """One EmailMessage covering a volunteer's pending rows (same user_id)."""
+    t = TRANSLATIONS.get(lang) or TRANSLATIONS["en"]
+    items = {}
+    for row in rows:
+        # Repeated edits of one event collapse into a line with the latest details.
+        key = ("event", row["event_id"]) if row["kind"] == "event_updated" else row["id"]
+        items[key] = row
+    lines = []
+    for row in items.values():
+        fields = {"title": "", "date": "", "location": "", "hours": ""}
+        fields.update(json.loads(row["payload"]))
+        lines.append("- " + t.get(NOTIFY_LINES.get(row["kind"]), "{title}").format_map(fields))
+    first = rows[0]
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = formataddr((first["name"], first["email"]))
+    msg["Subject"] = t["notify_subject"].format(count=len(lines))
+    msg.set_content("\n".join([t["notify_greeting"].format(name=first["name"]), "", *lines, "",
+                               t["notify_footer"]]))
+    return msg
+
+
+class SmtpPool:
+    """Up to `size` SMTP connections, reused from one digest to the next.
+
+    Connections open lazily. The connect (plus STARTTLS and login when
+    configured) costs more than sending a small message, so keeping them
+    open is where the throughput comes from. A connection is retired after
+    `max_messages` messages; one the server has dropped is replaced once.
+    """
+
+    def __init__(self, host, port, size=2, username=None, password=None, starttls=False,
+                 timeout=10.0, max_messages=100):
+        self.host, self.port = host, port
+        self.size = size
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self._idle = queue.LifoQueue()  # [smtplib.SMTP, messages sent]
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except BaseException:
+            smtp.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        return [smtp, 0]
+
+    @staticmethod
+    def _quit(conn):
+        try:
+            conn[0].quit()
+        except (OSError, smtplib.SMTPException):
+            conn[0].close()
+
+    def send(self, msg):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            conn[0].send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            conn[0].close()
+            if conn[1] == 0:
+                raise
+            conn = self._connect()  # idle connection timed out server-side; retry on a fresh one
+            try:
+                conn[0].send_message(msg)
+            except BaseException:
+                self._quit(conn)
+                raise
+        except BaseException:
+            self._quit(conn)
+            raise
+        conn[1] += 1
+        if conn[1] >= self.max_messages:
+            self._quit(conn)
+        else:
+            self._idle.put(conn)
+
+    def close(self):
+        """QUIT the idle connections (call when the outbox is drained)."""
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def smtp_pool():
+    cfg = current_app.config
+    return SmtpPool(cfg["MAIL_SERVER"], cfg["MAIL_PORT"], cfg["MAIL_POOL_SIZE"], cfg["MAIL_USERNAME"],
+                    cfg["MAIL_PASSWORD"], cfg["MAIL_STARTTLS"], cfg["MAIL_TIMEOUT"])
+
+
+def _try_send(pool, msg):
+    try:
+        pool.send(msg)
+    except (OSError, smtplib.SMTPException) as e:  # SMTPException is an OSError too
+        return e
+    return None
+
+
+def _permanent(error):
+    """5xx answers (unknown mailbox, rejected sender) will not succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _msg in error.recipients.values())
+    code = getattr(error, "smtp_code", None)
+    return code is not None and code >= 500
+
+
+def dispatch_notifications(db, pool, batch=None):
+    """Send every due digest, `batch` volunteers per round. Returns a report.
+
+    Each round sends its digests in parallel over the pool, then records the
+    outcome in one transaction. Failures wait NOTIFY_BACKOFF seconds, doubling
+    per attempt up to NOTIFY_BACKOFF_MAX. After NOTIFY_MAX_ATTEMPTS, or on a
+    permanent 5xx refusal, the rows are marked failed. A round in which every
+    send failed ends the pass: the server is down, and later rounds would fail
+    the same way.
+    """
+    cfg = current_app.config
+    batch = batch or cfg["NOTIFY_BATCH"]
+    started = time.perf_counter()
+    report = {"digests": 0, "notifications": 0, "sent": 0, "retrying": 0, "failed": 0,
+              "smtp_seconds": 0.0, "connections": 0, "stopped_early": False}
+    opened = pool.opened
+    with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="smtp") as executor:
+        while True:
+            now = datetime.utcnow()
+            now_s = now.strftime("%Y-%m-%d %H:%M:%S")
+            rows = db.execute(DUE_DIGESTS_SQL, (now_s, batch)).fetchall()
+            if not rows:
+                break
+            digests = [list(group) for _uid, group in groupby(rows, key=lambda r: r["user_id"])]
+            messages = [build_digest(group, cfg["NOTIFY_LANG"], cfg["MAIL_SENDER"]) for group in digests]
+            t0 = time.perf_counter()
+            errors = list(executor.map(_try_send, repeat(pool), messages))
+            report["smtp_seconds"] += time.perf_counter() - t0
+
+            for group, error in zip(digests, errors):
+                ids = [(r["id"],) for r in group]
+                attempts = max(r["attempts"] for r in group) + 1
+                report["digests"] += 1
+                report["notifications"] += len(ids)
+                if error is None:
+                    report["sent"] += 1
+                    db.executemany("UPDATE notifications SET status = 'sent', sent_at = ?, "
+                                   "attempts = attempts + 1, last_error = NULL WHERE id = ?",
+                                   [(now_s, i) for (i,) in ids])
+                elif _permanent(error) or attempts >= cfg["NOTIFY_MAX_ATTEMPTS"]:
+                    report["failed"] += 1
+                    db.executemany("UPDATE notifications SET status = 'failed', attempts = attempts + 1, "
+                                   "last_error = ? WHERE id = ?", [(repr(error)[:500], i) for (i,) in ids])
+                else:
+                    report["retrying"] += 1
+                    wait = min(cfg["NOTIFY_BACKOFF"] * 2 ** (attempts - 1), cfg["NOTIFY_BACKOFF_MAX"])
+                    retry_at = (now + timedelta(seconds=wait)).strftime("%Y-%m-%d %H:%M:%S")
+                    db.executemany("UPDATE notifications SET attempts = attempts + 1, last_error = ?, "
+                                   "next_attempt_at = ? WHERE id = ?",
+                                   [(repr(error)[:500], retry_at, i) for (i,) in ids])
+            db.commit()
+            if all(e is not None and not _permanent(e) for e in errors):
+                report["stopped_early"] = True
+                break
+
+    keep = (datetime.utcnow() - timedelta(days=cfg["NOTIFY_KEEP_DAYS"])).strftime("%Y-%m-%d %H:%M:%S")
+    db.execute("DELETE FROM notifications WHERE status = 'sent' AND sent_at < ?", (keep,))
+    db.commit()
+    pool.close()
+    seconds = time.perf_counter() - started
+    report["connections"] = pool.opened - opened
+    report["smtp_seconds"] = round(report["smtp_seconds"], 3)
+    report["seconds"] = round(seconds, 3)
+    report["digests_per_second"] = round(report["digests"] / seconds, 1) if seconds else 0.0
+    return report
+
+
+def outbox_stats(db):
+    """Row counts by status, oldest pending age and the last hour's deliveries."""
+    now = datetime.utcnow()
+    by_status, oldest = {"pending": 0, "sent": 0, "failed": 0}, None
+    for status, n, first in db.execute(
+            "SELECT status, COUNT(*), MIN(created_at) FROM notifications GROUP BY status"):
+        by_status[status] = n
+        if status == "pending":
+            oldest = first
+    hour_ago = (now - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+    sent = db.execute("SELECT COUNT(*) FROM notifications WHERE sent_at >= ?", (hour_ago,)).fetchone()[0]
+    age = (now - datetime.strptime(oldest, "%Y-%m-%d %H:%M:%S")).total_seconds() if oldest else 0
+    return {"by_status": by_status, "oldest_pending_seconds": round(age), "sent_last_hour": sent}
+
+
+@click.command("send-notifications")
+@click.option("--watch", type=float, default=None, metavar="SECONDS",
+              help="Keep running and check the outbox every SECONDS.")
+@click.option("--batch", type=int, default=None, help="Volunteers per round (default NOTIFY_BATCH).")
+@with_appcontext
+def send_notifications_command(watch, batch):
+    """CLI: flask --app app.py send-notifications [--watch 60]"""
+    pool = smtp_pool()
+    while True:
+        report = dispatch_notifications(get_db(), pool, batch)
+        if report["digests"] or not watch:
+            print(json.dumps(report), flush=True)
+        if not watch:
+            break
+        time.sleep(watch)
+
+
+# Reports (served from the report_rollups table, see schema.sql)
+
+ROLLUP_COLUMNS = "dim, bucket, key, registrations, attended, cancelled, hours"
+
+ROLLUP_SELECT_SQL = """
+    SELECT d.dim, substr(COALESCE(e.start_dt, e.date), 1, 7),
+           CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN e.location ELSE CAST(e.id AS TEXT) END,
+           COUNT(*), SUM(r.status = 'attended'), SUM(r.status = 'cancelled'), COALESCE(SUM(r.hours), 0)
+      FROM {registrations} r
+      JOIN {events} e ON e.id = r.event_id,
+           (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+     {where}
+     GROUP BY 1, 2, 3
+"""
+
+ROLLUP_REBUILD_SQL = (
+    "DELETE FROM report_rollups;\n"
+    f"INSERT INTO report_rollups ({ROLLUP_COLUMNS})"
+    + ROLLUP_SELECT_SQL.format(events="events", registrations="registrations", where="") + ";\n"
+)
+
+
+def rebuild_rollups(db, events="events", registrations="registrations"):
+    """Recompute every rollup row from registrations (one full scan)."""
+    db.executescript(
+        "BEGIN;\nDELETE FROM report_rollups;\n"
+        f"INSERT INTO report_rollups ({ROLLUP_COLUMNS})"
+        + ROLLUP_SELECT_SQL.format(events=events, registrations=registrations, where="")
+        + ";\nCOMMIT;"
+    )
+
+
+@click.command("rebuild-reports")
+@with_appcontext
+def rebuild_reports_command():
+    """CLI: flask --app app.py rebuild-reports"""
+    t0 = time.perf_counter()
+    # Archived registrations still count towards the reports.
+    rebuild_rollups(history_db(), "all_events", "all_registrations")
+    print(f"Rebuilt report rollups in {time.perf_counter() - t0:.2f}s.")
+
+
+def _with_rates(row):
+    d = dict(row)
+    n = d["registrations"] or 0
+    d["hours"] = round(d["hours"] or 0, 2)
+    d["attendance_rate"] = round(d["attended"] / n, 4) if n else 0.0
+    d["cancellation_rate"] = round(d["cancelled"] / n, 4) if n else 0.0
+    return d
+
+
+def build_report(db, start, end, top=50):
+    """Hours and participation between two months (inclusive, 'YYYY-MM').
+
+    `db` needs the all_* views (history_db() or report_db()), so archived
+    events keep their titles.
+    """
+    by_month = [_with_rates(r) for r in db.execute(
+        """
+        SELECT bucket AS month, registrations, attended, cancelled, hours
+          FROM report_rollups
+         WHERE dim = 'all' AND bucket BETWEEN ? AND ?
+         ORDER BY bucket
+        """, (start, end)).fetchall()]
+
+    # Same months one year earlier, for year-over-year comparison
+    prev = {r["month"]: r for r in db.execute(
+        """
+        SELECT bucket AS month, registrations, hours
+          FROM report_rollups
+         WHERE dim = 'all' AND bucket BETWEEN ? AND ?
+        """, (_shift_year(start, -1), _shift_year(end, -1))).fetchall()}
+    for m in by_month:
+        p = prev.get(_shift_year(m["month"], -1))
+        m["hours_prev_year"] = round(p["hours"], 2) if p else 0.0
+        m["registrations_prev_year"] = p["registrations"] if p else 0
+
+    by_location = [_with_rates(r) for r in db.execute(
+        """
+        SELECT key AS location, SUM(registrations) AS registrations, SUM(attended) AS attended,
+               SUM(cancelled) AS cancelled, SUM(hours) AS hours
+          FROM report_rollups
+         WHERE dim = 'location' AND bucket BETWEEN ? AND ?
+         GROUP BY key
+        HAVING SUM(registrations) > 0
+         ORDER BY hours DESC
+        """, (start, end)).fetchall()]
+
+    by_event = [_with_rates(r) for r in db.execute(
+        """
+        SELECT CAST(ro.key AS INTEGER) AS event_id, e.title, ro.bucket AS month,
+               ro.registrations, ro.attended, ro.cancelled, ro.hours
+          FROM report_rollups ro
+          LEFT JOIN all_events e ON e.id = CAST(ro.key AS INTEGER)
+         WHERE ro.dim = 'event' AND ro.bucket BETWEEN ? AND ? AND ro.registrations > 0
+         ORDER BY ro.hours DESC, ro.registrations DESC
+         LIMIT ?
+        """, (start, end, top)).fetchall()]
+
+    keys = ("registrations", "attended", "cancelled", "hours")
+    totals = _with_rates({k: sum(m[k] for m in by_month) for k in keys})
+    return {"from": start, "to": end, "totals": totals, "by_month": by_month,
+            "by_location": by_location, "by_event": by_event,
+            "snapshot": g.get("report_snapshot") if has_request_context() else None}
+
+
+def _shift_year(month, years):
+    return f"{int(month[:4]) + years:04d}{month[4:]}"
+
+
+def _report_range():
+    """?from=YYYY-MM&to=YYYY-MM, defaulting to January last year .. December this year."""
+    year = datetime.now().year
+    start = request.args.get("from") or f"{year - 1}-01"
+    end = request.args.get("to") or f"{year}-12"
+    for value in (start, end):
+        try:
+            datetime.strptime(value, "%Y-%m")
+        except ValueError:
+            return None
+    return (start, end) if start <= end else (end, start)
+
+
+@bp.route("/admin/reports")
+@admin_required
+def reports():
+    rng = _report_range()
+    if rng is None:
+        flash("Use YYYY-MM for the report range.")
+        return redirect(url_for("main.reports"))
+    report = build_report(report_db(), *rng)
+    max_hours = max([m["hours"] for m in report["by_month"]] +
+                    [m["hours_prev_year"] for m in report["by_month"]] + [1])
+    return render_template("reports.html", report=report, max_hours=max_hours)
+
+
+@bp.route("/admin/reports.json")
+@admin_required
+def reports_json():
+    rng = _report_range()
+    if rng is None:
+        return jsonify({"error": "Use YYYY-MM for from/to."}), 400
+    return jsonify(build_report(report_db(), *rng))
+
+
+# Archive: finished events and their registrations move to a separate
+# SQLite file (ARCHIVE_DATABASE), attached as "archive" when history is needed.
+
+ARCHIVED_TABLES = ("events", "registrations")
+
+
+def _columns(db, schema, table):
+    return [(r["name"], r["type"]) for r in db.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def live_archive():
+    """Path of ARCHIVE_DATABASE, or None while nothing has been archived."""
+    path = current_app.config["ARCHIVE_DATABASE"]
+    return path if path and os.path.exists(path) else None
+
+
+def _attach_archive(db, path):
+    """ATTACH `path` (a file name or a file: URI) to `db` as "archive"."""
+    if not any(r["name"] == "archive" for r in db.execute("PRAGMA database_list")):
+        db.execute("ATTACH DATABASE ? AS archive", (path,))
+
+
+def _sync_archive_schema(db):
+    """Give the attached archive the live tables' columns and indexes.
+
+    Runs when archiving and from init-db. History reads only ATTACH, so
+    they never write to the archive.
+    """
+    # Same columns as the live tables, so rows copy across and the views line up.
+    for table in ARCHIVED_TABLES:
+        have = {name for name, _ in _columns(db, "archive", table)}
+        cols = _columns(db, "main", table)
+        if not have:
+            defs = ", ".join("id INTEGER PRIMARY KEY" if n == "id" else f"{n} {t}" for n, t in cols)
+            db.execute(f"CREATE TABLE archive.{table} ({defs})")
+        else:
+            for name, typ in cols:
+                if name not in have:
+                    db.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {typ}")
+    db.execute("CREATE INDEX IF NOT EXISTS archive.idx_registrations_user ON registrations(user_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS archive.idx_registrations_event ON registrations(event_id)")
+    db.commit()
+    current_app.extensions.pop("history_columns", None)
+
+
+def _column_lists(db):
+    return {table: ", ".join(name for name, _ in _columns(db, "main", table)) for table in ARCHIVED_TABLES}
+
+
+def history_columns():
+    """{table: "col, col, ..."} of the archived tables, read once per process."""
+    cols = current_app.extensions.get("history_columns")
+    if cols is None:
+        cols = current_app.extensions["history_columns"] = _column_lists(get_db())
+    return cols
+
+
+def history_db():
+    """get_db() plus the TEMP views all_events / all_registrations.
+
+    They cover the live tables and, once something has been archived, the
+    archive file too. Only exports, certificates and volunteer history use
+    them; every other page reads the live tables alone.
+    """
+    db = get_db()
+    if not getattr(db, "history_ready", False):
+        _history_views(db, live_archive(), history_columns())
+    return db
+
+
+def _history_views(db, archive, columns):
+    """Create the all_* TEMP views on `db`, over `archive` too when given."""
+    if archive:
+        _attach_archive(db, archive)
+    for table in ARCHIVED_TABLES:
+        sql = f"SELECT {columns[table]} FROM main.{table}"
+        if archive:
+            sql += f" UNION ALL SELECT {columns[table]} FROM archive.{table}"
+        db.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+        db.execute(f"CREATE TEMP VIEW all_{table} AS {sql}")
+    db.history_ready = True
+    return db
+
+
+def archive_before(db, cutoff, batch=500):
+    """Move events that ended before `cutoff` (and their registrations) to the archive.
+
+    Works in batches of `batch` events, one short transaction each, so the
+    app keeps writing in between. Copies use INSERT OR REPLACE by id, so an
+    interrupted run can simply be repeated.
+    """
+    _attach_archive(db, current_app.config["ARCHIVE_DATABASE"])
+    _sync_archive_schema(db)
+    db.history_ready = False
+    ecols = ", ".join(name for name, _ in _columns(db, "main", "events"))
+    rcols = ", ".join(name for name, _ in _columns(db, "main", "registrations"))
+    moved = {"events": 0, "registrations": 0}
+    while True:
+        ids = [r["id"] for r in db.execute(
+            "SELECT id FROM main.events WHERE COALESCE(end_dt, start_dt, date) < ? ORDER BY id LIMIT ?",
+            (cutoff, batch))]
+        if not ids:
+            break
+        marks = ",".join("?" * len(ids))
+        db.execute(f"INSERT OR REPLACE INTO archive.events ({ecols}) "
+                   f"SELECT {ecols} FROM main.events WHERE id IN ({marks})", ids)
+        db.execute(f"INSERT OR REPLACE INTO archive.registrations ({rcols}) "
+                   f"SELECT {rcols} FROM main.registrations WHERE event_id IN ({marks})", ids)
+        # Reports keep archived history: add back what the delete triggers subtract.
+        db.execute(
+            f"INSERT INTO report_rollups ({ROLLUP_COLUMNS})"
+            + ROLLUP_SELECT_SQL.format(events="main.events", registrations="main.registrations",
+                                       where=f"WHERE r.event_id IN ({marks})")
+            + """ON CONFLICT (dim, bucket, key) DO UPDATE SET
+                    registrations = registrations + excluded.registrations,
+                    attended = attended + excluded.attended,
+                    cancelled = cancelled + excluded.cancelled,
+                    hours = hours + excluded.hours""", ids)
+        moved["registrations"] += db.execute(
+            f"DELETE FROM main.registrations WHERE event_id IN ({marks})", ids).rowcount
+        moved["events"] += db.execute(f"DELETE FROM main.events WHERE id IN ({marks})", ids).rowcount
+        db.commit()
+    return moved
+
+
+@click.command("archive")
+@click.option("--before", "before", required=True, help="Archive events that ended before this date (YYYY-MM-DD).")
+@click.option("--batch", type=int, default=500, show_default=True, help="Events per transaction.")
+@with_appcontext
+def archive_command(before, batch):
+    """CLI: flask --app app.py archive --before 2025-01-01"""
+    try:
+        cutoff = datetime.strptime(before, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise click.BadParameter("use YYYY-MM-DD", param_hint="--before")
+    t0 = time.perf_counter()
+    moved = archive_before(get_db(), cutoff, batch)
+    print(f"Archived {moved['events']} events and {moved['registrations']} registrations "
+          f"to {current_app.config['ARCHIVE_DATABASE']} in {time.perf_counter() - t0:.2f}s.")
+
+
+# Backups. `flask backup` copies a database with SQLite's online backup API
+# into BACKUP_DIR as <name>-<UTC time>.db, checks the copy, then drops the
+# oldest beyond BACKUP_KEEP. With REPORTS_FROM_SNAPSHOT on, exports and
+# reports read the newest snapshot instead of the live file.
+
+SNAPSHOT_STAMP = "%Y%m%dT%H%M%SZ"
+
+
+class BackupError(Exception):
+    """A snapshot failed its check, or a backup/restore could not finish."""
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def snapshot_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def list_snapshots(backup_dir, name):
+    """[(taken_at datetime, path)] for database `name`, newest first."""
+    pattern = re.compile(re.escape(name) + r"-(\d{8}T\d{6}Z)\.db$")
+    found = []
+    if os.path.isdir(backup_dir):
+        for entry in os.listdir(backup_dir):
+            m = pattern.match(entry)
+            if m:
+                found.append((datetime.strptime(m.group(1), SNAPSHOT_STAMP), os.path.join(backup_dir, entry)))
+    return sorted(found, reverse=True)
+
+
+def check_database(path, full=False):
+    """"ok", or SQLite's first complaints.
+
+    quick_check reads every page but skips matching index entries against
+    their rows, so it is several times faster than integrity_check.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("PRAGMA integrity_check(10)" if full else "PRAGMA quick_check(10)").fetchall()
+    finally:
+        conn.close()
+    return "; ".join(r[0] for r in rows)
+
+
+def _copy_pages(src, dst, schema, pages, pause, max_restarts):
+    """src.backup(dst) of `schema`, `pages` pages per step with `pause` seconds between.
+
+    Each step locks the source only while it copies its pages, so writers
+    get in between steps (in WAL mode they are never blocked at all). A
+    write through another connection restarts the copy: the remaining page
+    count jumps back up. Past `max_restarts`, _TooManyRestarts is raised.
+    """
+    state = {"steps": 0, "restarts": 0, "remaining": None}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        state["remaining"] = remaining
+        state["steps"] += 1
+        if remaining and pause:
+            time.sleep(pause)
+
+    src.backup(dst, pages=pages, progress=progress, name=schema)
+    del state["remaining"]
+    return state
+
+
+def archive_copy_path(snapshot):
+    """Where the copy of archive.db taken with `snapshot` lives."""
+    return snapshot[:-len(".db")] + ".archive.db"
+
+
+def backup_database(source, backup_dir, keep=None, full_check=False, label=None, archive=None):
+    """Snapshot `source` (and `archive`, if given) into `backup_dir`, then rotate.
+
+    Returns a report dict. When the source is in WAL mode, both files are
+    copied inside one read transaction. They are then a consistent pair: a
+    row the archive command moves mid-backup is in exactly one of them.
+    Writers carry on meanwhile, and the stepped copy never restarts. In
+    rollback-journal mode each step locks the source only while it copies
+    its pages. If writes keep restarting the copy, it finishes in a single
+    step.
+
+    Copies are written to .partial files and renamed only after they pass
+    quick_check (integrity_check with `full_check`). The archive copy sits
+    next to the snapshot as <snapshot>.archive.db and is rotated with it. A
+    `label` (e.g. "pre-restore") goes into the file name, which keeps the
+    copy out of rotation and out of latest_snapshot().
+    """
+    cfg = current_app.config
+    os.makedirs(backup_dir, exist_ok=True)
+    name = snapshot_name(source)
+    taken_at = datetime.utcnow()
+    prefix = f"{name}-{label}" if label else name
+    final = os.path.join(backup_dir, f"{prefix}-{taken_at.strftime(SNAPSHOT_STAMP)}.db")
+    copies = [("main", final)] + ([("archive", archive_copy_path(final))] if archive else [])
+    started = time.perf_counter()
+
+    src = sqlite3.connect(source, timeout=cfg["DB_BUSY_TIMEOUT"], isolation_level=None)
+    try:
+        if archive:
+            src.execute("ATTACH DATABASE ? AS archive", (f"file:{quote(os.path.abspath(archive))}?mode=ro",))
+        if src.execute("PRAGMA main.journal_mode").fetchone()[0] == "wal":
+            src.execute("BEGIN")
+            for schema, _path in copies:  # start the read transaction on every file now
+                src.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master").fetchone()
+        state = {}
+        for schema, path in copies:
+            dst = sqlite3.connect(path + ".partial")
+            try:
+                try:
+                    state[schema] = _copy_pages(src, dst, schema, cfg["BACKUP_PAGES"], cfg["BACKUP_PAUSE"],
+                                                cfg["BACKUP_MAX_RESTARTS"])
+                except _TooManyRestarts:
+                    state[schema] = {"steps": 1, "restarts": cfg["BACKUP_MAX_RESTARTS"] + 1, "single_step": True}
+                    src.backup(dst, name=schema)
+                # A stand-alone file: no -wal/-shm, safe to copy off the host as is.
+                dst.execute("PRAGMA journal_mode = DELETE")
+                state[schema]["pages"] = dst.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                dst.close()
+        if src.in_transaction:
+            src.execute("COMMIT")
+    finally:
+        src.close()
+    copy_seconds = time.perf_counter() - started
+
+    for schema, path in copies:
+        check = check_database(path + ".partial", full_check)
+        if check != "ok":
+            for _schema, p in copies:
+                os.remove(p + ".partial")
+            raise BackupError(f"{path}: snapshot failed {'integrity_check' if full_check else 'quick_check'}: "
+                              f"{check}")
+    for _schema, path in copies:
+        os.replace(path + ".partial", path)
+
+    removed = []
+    if keep:
+        for _taken, path in list_snapshots(backup_dir, name)[keep:]:
+            for old in (path, archive_copy_path(path)):
+                if os.path.exists(old):
+                    os.remove(old)
+                    removed.append(os.path.basename(old))
+    main = state.pop("main")
+    return {"snapshot": final, "archive": copies[1][1] if archive else None,
+            "taken_at": taken_at.strftime("%Y-%m-%d %H:%M:%S"), "bytes": os.path.getsize(final), **main,
+            "archive_copy": state.get("archive"), "copy_seconds": round(copy_seconds, 3), "check": check,
+            "check_seconds": round(time.perf_counter() - started - copy_seconds, 3), "removed": removed}
+
+
+def restore_database(snapshot, target):
+    """Copy `snapshot` over `target` through the backup API.
+
+    The snapshot gets a full integrity_check first. The copy runs in one
+    step under the target's write lock, so connections that are open on the
+    target see either the old database or the restored one, never a mix.
+    """
+    check = check_database(snapshot, full=True)
+    if check != "ok":
+        raise BackupError(f"{snapshot}: integrity_check failed: {check}")
+    src = sqlite3.connect(snapshot)
+    dst = sqlite3.connect(target, timeout=current_app.config["DB_BUSY_TIMEOUT"])
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return check_database(target)
+
+
+def latest_snapshot():
+    """(taken_at, path, archive copy or None) of the newest snapshot of DATABASE, or None.
+
+    Snapshots older than REPORTS_SNAPSHOT_MAX_AGE seconds don't count. Nor
+    does one without an archive copy once an archive exists: mixing it with
+    the live archive would count rows archived since the snapshot twice.
+    """
+    cfg = current_app.config
+    snaps = list_snapshots(cfg["BACKUP_DIR"], snapshot_name(cfg["DATABASE"]))
+    if not snaps:
+        return None
+    taken_at, path = snaps[0]
+    max_age = cfg["REPORTS_SNAPSHOT_MAX_AGE"]
+    if max_age and (datetime.utcnow() - taken_at).total_seconds() > max_age:
+        return None
+    archive = archive_copy_path(path)
+    if not os.path.exists(archive):
+        if live_archive():
+            return None
+        archive = None
+    return taken_at, path, archive
+
+
+def report_db():
+    """Connection for long read-only scans: CSV exports and reports.
+
+    With REPORTS_FROM_SNAPSHOT on and a recent enough snapshot, this is that
+    file, opened immutable (no locks at all). It gets the same all_* views as
+    history_db(), built over the archive copy taken with the snapshot, so
+    nothing live is read or written. g.report_snapshot records when the
+    snapshot was taken. Otherwise this is history_db().
+    """
+    if "report_db" not in g:
+        snap = latest_snapshot() if current_app.config["REPORTS_FROM_SNAPSHOT"] else None
+        if snap is None:
+            g.report_snapshot = None
+            g.report_db = history_db()
+        else:
+            conn = sqlite3.connect(f"file:{quote(os.path.abspath(snap[1]))}?immutable=1", uri=True,
+                                   detect_types=sqlite3.PARSE_DECLTYPES, factory=ProfiledConnection)
+            conn.row_factory = sqlite3.Row
+            conn.profile = sql_profile()
+            conn.metrics = current_app.extensions.get("metrics")
+            g.report_snapshot = snap[0].strftime("%Y-%m-%d %H:%M:%S")
+            archive = snap[2] and f"file:{quote(os.path.abspath(snap[2]))}?immutable=1"
+            g.report_db = _history_views(conn, archive, _column_lists(conn))
+    return g.report_db
+
+
+@click.command("backup")
+@click.option("--database", "source", type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Database to copy (default: DATABASE, together with ARCHIVE_DATABASE).")
+@click.option("--keep", type=int, default=None, help="Snapshots to keep (default BACKUP_KEEP; 0 keeps all).")
+@click.option("--full-check", is_flag=True, help="integrity_check instead of quick_check.")
+@click.option("--every", type=float, default=None, metavar="SECONDS",
+              help="Keep running and take a snapshot every SECONDS.")
+@with_appcontext
+def backup_command(source, keep, full_check, every):
+    """CLI: flask --app app.py backup [--every 3600]"""
+    cfg = current_app.config
+    source = source or cfg["DATABASE"]
+    keep = cfg["BACKUP_KEEP"] if keep is None else keep
+    while True:
+        try:
+            archive = live_archive() if source == cfg["DATABASE"] else None
+            report = backup_database(source, cfg["BACKUP_DIR"], keep, full_check, archive=archive)
+        except (BackupError, sqlite3.Error) as e:
+            if not every:
+                raise click.ClickException(str(e))
+            report = {"error": str(e)}
+        print(json.dumps(report), flush=True)
+        if not every:
+            break
+        time.sleep(every)
+
+
+@click.command("restore")
+@click.argument("snapshot", required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option("--database", "target", type=click.Path(dir_okay=False), default=None,
+              help="Database to overwrite (default: DATABASE).")
+@click.option("--yes", is_flag=True, help="Don't ask for confirmation.")
+@with_appcontext
+def restore_command(snapshot, target, yes):
+    """CLI: flask --app app.py restore [SNAPSHOT]   (default: the newest one)"""
+    cfg = current_app.config
+    target = target or cfg["DATABASE"]
+    if snapshot is None:
+        snaps = list_snapshots(cfg["BACKUP_DIR"], snapshot_name(target))
+        if not snaps:
+            raise click.ClickException(f"No snapshots of {snapshot_name(target)} in {cfg['BACKUP_DIR']}.")
+        snapshot = snaps[0][1]
+    # The archive goes back to the same moment, or rows archived since would exist twice.
+    archive = None
+    if target == cfg["DATABASE"]:
+        archive = archive_copy_path(snapshot) if os.path.exists(archive_copy_path(snapshot)) else None
+        if archive is None and live_archive():
+            raise click.ClickException(
+                f"{snapshot} has no archive copy, so it cannot be restored next to the current "
+                f"{cfg['ARCHIVE_DATABASE']}. Move that file aside first if this is intended.")
+    if not yes:
+        click.confirm(f"Replace {target} with {snapshot}? Stop the app servers first", abort=True)
+    try:
+        if os.path.exists(target):
+            saved = backup_database(target, cfg["BACKUP_DIR"], label="pre-restore",
+                                    archive=live_archive() if archive else None)
+            print(f"Current database saved as {saved['snapshot']}.")
+        check = restore_database(snapshot, target)
+        if archive:
+            restore_database(archive, cfg["ARCHIVE_DATABASE"])
+    except (BackupError, sqlite3.Error) as e:
+        raise click.ClickException(str(e))
+    print(f"Restored {target} from {snapshot}{' with its archive copy' if archive else ''} "
+          f"(quick_check: {check}).")
 
 
 # Exports & misc
 
-@app.route("/admin/export.csv")
+@bp.route("/admin/export.csv")
 @admin_required
 def export_csv():
-    db = get_db()
-    rows = db.execute(
-        """
-        SELECT u.name AS volunteer_name, u.email,
-               e.title AS event_title, e.date AS event_date,
-               r.status, r.hours, r.registered_at
-        FROM registrations r
-        JOIN users u ON u.id = r.user_id
-        JOIN events e ON e.id = r.event_id
-        ORDER BY e.date DESC, u.name ASC
-        """
-    ).fetchall()
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Volunteer", "Email", "Event", "Event Date",
-                    "Status", "Hours", "Registered At"])
-    for row in rows:
-        writer.writerow([row["volunteer_name"], row["email"], row["event_title"],
-                        row["event_date"], row["status"], row["hours"], row["registered_at"]])
-    output.seek(0)
-    return Response(output.getvalue(), mimetype="text/csv",
+    app = current_app._get_current_object()
+
+    def generate():
+        # Streamed in ~64 KB pieces so memory stays flat for large exports. The
+        # body outlives the request, so it reads on its own app context/connection.
+        with app.app_context():
+            rows = report_db().execute(
+                """
+                SELECT u.name AS volunteer_name, u.email,
+                       e.title AS event_title, e.date AS event_date,
+                       r.status, r.hours, r.registered_at
+                FROM all_registrations r
+                JOIN users u ON u.id = r.user_id
+                JOIN all_events e ON e.id = r.event_id
+                ORDER BY e.date DESC, u.name ASC
+                """
+            )
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(["Volunteer", "Email", "Event", "Event Date",
+                            "Status", "Hours", "Registered At"])
+            for row in rows:
+                writer.writerow([row["volunteer_name"], row["email"], row["event_title"],
+                                row["event_date"], row["status"], row["hours"], row["registered_at"]])
+                if output.tell() >= 65536:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            yield output.getvalue()
+
+    return Response(generate(), mimetype="text/csv",
                     headers={"Content-Disposition": "attachment; filename=registrations_export.csv"})
 
 
-@app.route("/certificate/<int:reg_id>.pdf")
+@bp.route("/certificate/<int:reg_id>.pdf")
 @login_required
 def certificate_pdf(reg_id: int):
     if not REPORTLAB_AVAILABLE:
         flash("PDF generation is not available on this server.")
-        return redirect(url_for("dashboard_volunteer"))
-    db = get_db()
+        return redirect(url_for("main.dashboard_volunteer"))
+    db = history_db()
     reg = db.execute(
         """
         SELECT r.*, u.name AS user_name, e.title AS event_title, e.date AS event_date
-        FROM registrations r
+        FROM all_registrations r
         JOIN users u ON u.id = r.user_id
-        JOIN events e ON e.id = r.event_id
+        JOIN all_events e ON e.id = r.event_id
         WHERE r.id = ?
         """, (reg_id,)
     ).fetchone()
     if not reg:
         flash(_("event_not_found"))
-        return redirect(url_for("dashboard_volunteer"))
+        return redirect(url_for("main.dashboard_volunteer"))
     if session.get("role") != "admin" and reg["user_id"] != session.get("user_id"):
         flash("Not allowed.")
-        return redirect(url_for("dashboard_volunteer"))
+        return redirect(url_for("main.dashboard_volunteer"))
 
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
@@ -1046,14 +3631,13 @@ def certificate_pdf(reg_id: int):
     return send_file(buffer, as_attachment=True, download_name=f"certificate_{reg_id}.pdf", mimetype="application/pdf")
 
 
-@app.route("/events/<int:event_id>/ics")
+@bp.route("/events/<int:event_id>/ics")
 @login_required
-def event_ics(event_id: int):
-    db = get_db()
-    ev = db.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+async def event_ics(event_id: int):
+    ev = await read_db().aquery("SELECT * FROM events WHERE id = ?", (event_id,), one=True)
     if not ev:
         flash(_("event_not_found"))
-        return redirect(url_for("events"))
+        return redirect(url_for("main.events"))
     raw = str(ev["date"])
     dtstart = None
     for p in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
@@ -1077,23 +3661,429 @@ def event_ics(event_id: int):
                     headers={"Content-Disposition": f"attachment; filename=event_{event_id}.ics"})
 
 
-@app.route("/favicon.ico")
+# Static assets. `flask build-assets` copies these into static/dist under
+# content-hashed names, with .gz (and .br) siblings, and writes
+# static/dist/manifest.json. Templates call asset_url(); hashed files never
+# change, so they are served with a one-year immutable Cache-Control.
+
+VENDOR_ASSETS = {  # saved under static/vendor/, downloaded once if missing
+    "vendor/bootstrap.min.css": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+    "vendor/bootstrap.bundle.min.js": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js",
+}
+LOCAL_ASSETS = ("css/styles.css", "js/main.js", "favicon.svg")
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".ico")
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+
+def _asset_source(static_dir, name):
+    """static/<name>, or the file of the same basename at the project root."""
+    for path in (os.path.join(static_dir, name),
+                 os.path.join(os.path.dirname(static_dir), os.path.basename(name))):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _asset_builds(dist):
+    """Manifests of earlier builds, newest first (static/dist/builds.json)."""
+    try:
+        with open(os.path.join(dist, "builds.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def build_assets(static_dir, fetch=True):
+    """Fingerprint and precompress assets into static/dist; returns the manifest.
+
+    Files of earlier builds stay: workers that haven't restarted yet, and
+    cached pages, still link to them. prune_assets() removes old ones.
+    """
+    from urllib.request import urlopen
+
+    dist = os.path.join(static_dir, "dist")
+    manifest, missing = {}, []
+    for name in (*VENDOR_ASSETS, *LOCAL_ASSETS):
+        src = _asset_source(static_dir, name)
+        if src is None and name in VENDOR_ASSETS and fetch:
+            src = os.path.join(static_dir, name)
+            os.makedirs(os.path.dirname(src), exist_ok=True)
+            with urlopen(VENDOR_ASSETS[name], timeout=30) as resp, open(src, "wb") as out:
+                out.write(resp.read())
+        if src is None:
+            missing.append(name)
+            continue
+        with open(src, "rb") as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        out = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "wb") as f:
+            f.write(data)
+        if ext in COMPRESSIBLE:
+            with open(out + ".gz", "wb") as f:
+                f.write(gzip.compress(data, 9, mtime=0))
+            if BROTLI_AVAILABLE:
+                with open(out + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+        manifest[name] = "dist/" + hashed
+    os.makedirs(dist, exist_ok=True)
+    builds = [b for b in _asset_builds(dist) if b["manifest"] != manifest]
+    builds.insert(0, {"built_at": datetime.now().isoformat(timespec="seconds"), "manifest": manifest})
+    with open(os.path.join(dist, "builds.json"), "w", encoding="utf-8") as f:
+        json.dump(builds, f, indent=2, sort_keys=True)
+    with open(os.path.join(dist, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, missing
+
+
+def prune_assets(static_dir, keep=2):
+    """Delete hashed files that none of the newest `keep` builds use.
+
+    Run once every worker serves the new build and cached pages have
+    expired. Returns the number of files removed.
+    """
+    dist = os.path.join(static_dir, "dist")
+    builds = _asset_builds(dist)[:max(keep, 1)]
+    if not builds:
+        return 0
+    used = {os.path.join(dist, path[len("dist/"):]) for b in builds for path in b["manifest"].values()}
+    removed = 0
+    for folder, _dirs, files in os.walk(dist):
+        for fn in files:
+            path = os.path.join(folder, fn)
+            base = path[:-3] if path.endswith((".gz", ".br")) else path
+            if base not in used and fn not in ("manifest.json", "builds.json"):
+                os.remove(path)
+                removed += 1
+    with open(os.path.join(dist, "builds.json"), "w", encoding="utf-8") as f:
+        json.dump(builds, f, indent=2, sort_keys=True)
+    return removed
+
+
+@click.command("build-assets")
+@click.option("--offline", is_flag=True, help="Don't download missing vendor files.")
+@with_appcontext
+def build_assets_command(offline):
+    """CLI: flask --app app.py build-assets"""
+    manifest, missing = build_assets(current_app.static_folder, fetch=not offline)
+    for name, path in sorted(manifest.items()):
+        print(f"{name} -> {path}")
+    if not BROTLI_AVAILABLE:
+        print("brotli not installed: only .gz variants were written.")
+    if missing:
+        raise click.ClickException("missing: " + ", ".join(missing)
+                                   + " (put them under static/ or run without --offline)")
+
+
+@click.command("prune-assets")
+@click.option("--keep", type=int, default=2, show_default=True, help="Builds whose files stay.")
+@with_appcontext
+def prune_assets_command(keep):
+    """CLI: flask --app app.py prune-assets --keep 2"""
+    removed = prune_assets(current_app.static_folder, keep)
+    print(f"Removed {removed} files from older builds.")
+
+
+def asset_manifest():
+    """The build manifest, re-read when the file changes in debug mode."""
+    app = current_app
+    path = os.path.join(app.static_folder, "dist", "manifest.json")
+    cached = app.extensions.get("asset_manifest")
+    if cached is not None and not app.debug:
+        return cached[1]
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime, manifest = None, {}
+    else:
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    app.extensions["asset_manifest"] = (mtime, manifest)
+    return manifest
+
+
+@bp.app_template_global()
+def asset_url(name):
+    """URL of a built asset; falls back to the CDN or the unhashed file before a build."""
+    built = asset_manifest().get(name)
+    if built:
+        return url_for("main.built_asset", filename=built[len("dist/"):])
+    if name in VENDOR_ASSETS:
+        return VENDOR_ASSETS[name]
+    return url_for("static", filename=name)
+
+
+@bp.route("/static/dist/<path:filename>")
+def built_asset(filename):
+    dist = os.path.join(current_app.static_folder, "dist")
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    resp = None
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        path = safe_join(dist, filename + suffix)
+        if request.accept_encodings[encoding] and path and os.path.isfile(path):
+            resp = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+            resp.headers["Content-Encoding"] = encoding
+            break
+    if resp is None:
+        resp = send_from_directory(dist, filename, mimetype=mimetype)
+    resp.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+@bp.route("/favicon.ico")
 def favicon():
-    """Serve favicon if present under static/; avoids double 404s."""
-    return send_from_directory(os.path.join(app.root_path, "static"), "favicon.ico",
+    """Browsers ask for /favicon.ico on their own; point them at the built icon."""
+    manifest = asset_manifest()
+    for name in ("favicon.ico", "favicon.svg"):
+        if name in manifest:
+            resp = redirect(asset_url(name))
+            resp.headers["Cache-Control"] = "public, max-age=86400"
+            return resp
+    return send_from_directory(os.path.join(current_app.root_path, "static"), "favicon.ico",
                                mimetype="image/vnd.microsoft.icon")
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def server_error(e):
     flash("An unexpected error occurred. Please try again.")
-    return redirect(url_for("home"))
+    return redirect(url_for("main.home"))
+
+
+# Response compression, negotiated from Accept-Encoding. Streamed bodies
+# are compressed chunk by chunk as they are sent.
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml",
+                      "image/svg+xml")
+
+
+def available_encodings():
+    """Encodings this server can produce, in preference order."""
+    preferred = current_app.config["COMPRESS_ENCODINGS"]
+    usable = {"gzip": True, "br": BROTLI_AVAILABLE, "zstd": ZSTD_AVAILABLE}
+    return [enc for enc in preferred if usable.get(enc)]
+
+
+def choose_encoding(accept):
+    """Highest-q encoding the client accepts; ties go to server preference."""
+    best, best_q = None, 0.0
+    for enc in available_encodings():
+        q = accept[enc]
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def new_compressor(encoding):
+    """(compress(chunk) -> bytes, finish() -> bytes) for one response body."""
+    level = current_app.config["COMPRESS_LEVELS"].get(encoding)
+    if encoding == "br":
+        c = brotli.Compressor(quality=level if level is not None else 4)
+        return c.process, c.finish
+    if encoding == "zstd":
+        c = zstandard.ZstdCompressor(level=level if level is not None else 3).compressobj()
+        return c.compress, c.flush
+    c = zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, 31)  # 31: gzip container
+    return c.compress, c.flush
+
+
+def _count_compression(m, encoding, size_in, size_out, cpu):
+    labels = {"encoding": encoding}
+    m.inc("http_compressed_responses_total", labels)
+    m.inc("http_compression_bytes_in_total", labels, size_in)
+    m.inc("http_compression_bytes_out_total", labels, size_out)
+    m.inc("http_compression_cpu_seconds_total", labels, cpu)
+
+
+def _compress_stream(chunks, encoding, compress, finish, m):
+    size_in = size_out = 0
+    cpu = 0.0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            size_in += len(chunk)
+            t0 = time.thread_time()
+            out = compress(chunk)
+            cpu += time.thread_time() - t0
+            if out:
+                size_out += len(out)
+                yield out
+        t0 = time.thread_time()
+        out = finish()
+        cpu += time.thread_time() - t0
+        size_out += len(out)
+        yield out
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        _count_compression(m, encoding, size_in, size_out, cpu)
+
+
+@bp.after_app_request
+def compress_response(response):
+    """gzip / br / zstd the body for clients that ask for it.
+
+    Skips small bodies (COMPRESS_MIN_SIZE), non-text types, file responses
+    (send_file; built assets are precompressed) and anything already encoded.
+    """
+    if not current_app.config["COMPRESS"] or request.method == "HEAD":
+        return response
+    mimetype = response.mimetype or ""
+    if not mimetype.startswith(COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or "Content-Encoding" in response.headers):
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    compress, finish = new_compressor(encoding)
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding, compress, finish, metrics())
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        t0 = time.thread_time()
+        body = compress(data) + finish()
+        _count_compression(metrics(), encoding, len(data), len(body), time.thread_time() - t0)
+        response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+# App factory
+
+def create_app(config=None):
+    """Build the Flask app. `flask --app app.py` and wsgi.py both call this.
+
+    Settings come from the defaults below, then FLASK_* environment
+    variables (e.g. FLASK_DATABASE=/srv/vh/app.db), then `config`.
+    """
+    app = Flask(__name__, instance_relative_config=True)
+    app.config.from_mapping(
+        SECRET_KEY=os.environ.get("SECRET_KEY", "dev-secret-key-CHANGE-ME"),
+        DATABASE=os.path.join(app.instance_path, "app.db"),
+        DB_BUSY_TIMEOUT=5.0,
+        READ_POOL_SIZE=int(os.environ.get("READ_POOL_SIZE", "8")),
+        ASGI=False,  # set by asgi.py: async views run on the server's event loop
+        ASGI_THREADS=16,  # asgi.py: requests handled at once per worker
+        SQL_PROFILE=None,  # None: profile (and send Server-Timing) only in debug mode or with the SQL panel
+        SQL_PANEL=None,  # None: show the SQL panel only in debug mode
+        SLOW_QUERY_MS=100.0,
+        SLOW_QUERY_LOG=os.path.join(app.instance_path, "slow_queries.log"),
+        SERIES_HORIZON_DAYS=60,
+        ARCHIVE_DATABASE=os.path.join(app.instance_path, "archive.db"),
+        METRICS_TOKEN=None,  # set to require "Authorization: Bearer <token>" on /metrics
+        IMPORT_HASH_WORKERS=None,  # password-hashing processes for bulk user import; None = CPU count
+        IMPORT_USERS_WEB_MAX=200,  # rows per dashboard upload; bigger files go through the CLI
+        HASH_WORKERS=None,  # password-hashing threads per worker process; None = half the CPUs
+        HASH_QUEUE=32,  # hashes allowed to wait before /login and /register answer 503
+        AUTH_RATE_IP=(20, 10),  # (burst, per minute) login/register attempts per client IP; None = off
+        AUTH_RATE_EMAIL=(5, 2),  # same, per email address
+        PROXY_FIX_X_FOR=0,  # reverse proxies in front of the app whose X-Forwarded-For is trusted; 0 = none
+        SESSION_BACKEND="sqlite",  # "sqlite" (server-side, see SqliteSessionInterface) or "cookie"
+        SESSION_DATABASE=None,  # None = the main DATABASE
+        SESSION_CACHE_SIZE=10_000,
+        SESSION_CACHE_TTL=5.0,  # seconds a cached session is trusted before re-reading it
+        COMPRESS=True,  # compress text responses for clients that send Accept-Encoding
+        COMPRESS_MIN_SIZE=500,  # bytes; smaller bodies go out as they are
+        COMPRESS_ENCODINGS=("zstd", "br", "gzip"),  # preference order; unavailable ones are skipped
+        COMPRESS_LEVELS={"gzip": 6, "br": 4, "zstd": 3},
+        MAIL_SERVER="localhost",
+        MAIL_PORT=25,
+        MAIL_USERNAME=None,
+        MAIL_PASSWORD=None,
+        MAIL_STARTTLS=False,
+        MAIL_TIMEOUT=10.0,
+        MAIL_POOL_SIZE=2,  # SMTP connections send-notifications keeps open
+        MAIL_SENDER="Volunteer Hub <no-reply@localhost>",
+        NOTIFY_DIGEST_DELAY=300,  # seconds a notification waits so others can join its digest
+        NOTIFY_BATCH=200,  # volunteers per dispatch round (one transaction)
+        NOTIFY_MAX_ATTEMPTS=6,
+        NOTIFY_BACKOFF=60,  # seconds before the first retry; doubles per attempt
+        NOTIFY_BACKOFF_MAX=6 * 3600,
+        NOTIFY_KEEP_DAYS=30,  # sent rows older than this are deleted
+        NOTIFY_LANG="ar",  # digest language (users have no stored preference)
+        BACKUP_DIR=os.path.join(app.instance_path, "backups"),
+        BACKUP_KEEP=7,  # newest snapshots kept per database
+        BACKUP_PAGES=1024,  # pages copied per backup step
+        BACKUP_PAUSE=0.005,  # seconds between steps, for writers to get in
+        BACKUP_MAX_RESTARTS=5,  # then finish the copy in one step
+        REPORTS_FROM_SNAPSHOT=False,  # exports and reports read the newest snapshot
+        REPORTS_SNAPSHOT_MAX_AGE=26 * 3600,  # older snapshots are ignored (live data instead); None = any
+    )
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
+    if app.config["PROXY_FIX_X_FOR"]:
+        # request.remote_addr (the per-IP auth limit) becomes the real client
+        # instead of the proxy every request comes through.
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
+    os.makedirs(app.instance_path, exist_ok=True)
+
+    if app.config["SLOW_QUERY_LOG"] and not slow_sql_log.handlers:
+        handler = logging.FileHandler(app.config["SLOW_QUERY_LOG"], encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_sql_log.addHandler(handler)
+        slow_sql_log.setLevel(logging.WARNING)
+
+    if not app.config["ASGI"]:
+        app.async_to_sync = run_inline
+
+    app.extensions["metrics"] = _new_metrics(app)
+    app.extensions["hash_pool"] = HashPool(
+        app.config["HASH_WORKERS"] or max(1, (os.cpu_count() or 2) // 2),
+        app.config["HASH_QUEUE"], app.extensions["metrics"])
+    if app.config["SESSION_BACKEND"] == "sqlite":
+        sessions = app.session_interface = SqliteSessionInterface(
+            app.config["SESSION_DATABASE"] or app.config["DATABASE"], app.config["DB_BUSY_TIMEOUT"],
+            app.config["SESSION_CACHE_SIZE"], app.config["SESSION_CACHE_TTL"])
+        app.extensions.setdefault("cache_stats", {})["sessions"] = lambda: (sessions.hits, sessions.misses)
+    app.extensions["auth_limits"] = {
+        scope: RateLimiter(*app.config[key]) if app.config[key] else None
+        for scope, key in (("ip", "AUTH_RATE_IP"), ("email", "AUTH_RATE_EMAIL"))
+    }
+    app.register_blueprint(bp)
+    app.teardown_appcontext(close_db)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(import_events_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(rebuild_reports_command)
+    app.cli.add_command(archive_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(prune_assets_command)
+    app.cli.add_command(send_notifications_command)
+    app.cli.add_command(backup_command)
+    app.cli.add_command(restore_command)
+    return app
+
+
+def warm_up(app):
+    """Compile all templates and open the read pool before serving traffic.
+
+    Called once per worker (see gunicorn.conf.py) so the first real request
+    doesn't pay for Jinja compilation or SQLite connection setup.
+    """
+    for name in app.jinja_env.list_templates(filter_func=lambda n: n.endswith(".html")):
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        if os.path.exists(app.config["DATABASE"]):
+            read_db().warm()
 
 
 # Entrypoint
 if __name__ == "__main__":
-    if not os.path.exists(DB_PATH):
+    app = create_app()
+    if not os.path.exists(app.config["DATABASE"]):
         with app.app_context():
             init_db()
-            print("Database created at:", DB_PATH)
+            print("Database created at:", app.config["DATABASE"])
     app.run(debug=True)
@@ -0,0 +1,40 @@
+"""
+Volunteer Hub - ASGI entry point
+
+Serve with any ASGI server, e.g.:
+
+    pip install "flask[async]" uvicorn
+    uvicorn asgi:asgi_app --workers 4
+
+Public read pages (home, events, event details, calendar files) are async
+views; here they run on the server's event loop and query through the
+read-only connection pool (ReadPool in app.py). Everything else, including
+all writes, keeps its sync code path through get_db().
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app import create_app, warm_up
+
+app = create_app({"ASGI": True})
+warm_up(app)
+
+# asgiref runs every WSGI call on one shared thread by default, which
+# serializes the whole worker; requests here are independent.
+_requests = ThreadPoolExecutor(max_workers=app.config["ASGI_THREADS"], thread_name_prefix="asgi")
+_run_wsgi_app = WsgiToAsgiInstance.__dict__["run_wsgi_app"].func  # without its sync_to_async
+
+
+class _Instance(WsgiToAsgiInstance):
+    run_wsgi_app = sync_to_async(_run_wsgi_app, thread_sensitive=False, executor=_requests)
+
+
+class _WsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _Instance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+asgi_app = _WsgiToAsgi(app)
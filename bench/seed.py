@@ -0,0 +1,170 @@
+"""
+Synthetic database generator for the benchmark suite.
+
+    python -m bench.seed --db instance/bench.db \\
+        --users 100000 --events 20000 --registrations 2000000
+
+Builds a fresh database from schema.sql and fills it with deterministic
+data (same --seed, same rows). Every synthetic account uses the password
+"bench-password"; user 1 is the admin (admin@bench.local).
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import ROLLUP_REBUILD_SQL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.local"
+CHUNK = 50_000
+
+LOCATIONS = [
+    "Main Hall", "Library", "Sports Center", "Student Union", "Lab Building",
+    "City Park", "Community Center", "Food Bank", "Old Campus", "Online",
+]
+# Events are scattered around these points (a regional deployment).
+CENTERS = [(24.7136, 46.6753), (21.4858, 39.1925), (26.4207, 50.0888), (18.2465, 42.5117)]
+TITLES = [
+    "Beach Cleanup", "Book Drive", "Orientation Day", "Charity Run", "Blood Drive",
+    "Tutoring Session", "Tree Planting", "Open House", "Career Fair", "Food Packing",
+]
+
+
+def _chunks(rows, size=CHUNK):
+    buf = []
+    for row in rows:
+        buf.append(row)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def _users(n, pw_hash):
+    yield ("Bench Admin", ADMIN_EMAIL, "admin", pw_hash)
+    for i in range(2, n + 1):
+        yield (f"Volunteer {i}", f"volunteer{i}@bench.local", "volunteer", pw_hash)
+
+
+def _events(n, rng, now):
+    # Three years of history plus one year of upcoming events.
+    span_hours = 4 * 365 * 24
+    first = now - timedelta(days=3 * 365)
+    for i in range(1, n + 1):
+        start = first + timedelta(hours=rng.randrange(span_hours))
+        start = start.replace(minute=rng.choice((0, 30)), second=0, microsecond=0)
+        end = start + timedelta(hours=rng.choice((1, 2, 2, 3, 4, 6)))
+        start_s, end_s = start.strftime("%Y-%m-%dT%H:%M"), end.strftime("%Y-%m-%dT%H:%M")
+        lat, lng = rng.choice(CENTERS)
+        yield (
+            f"{rng.choice(TITLES)} #{i}", "Synthetic benchmark event.",
+            start_s, rng.choice(LOCATIONS), rng.choice((None, 50, 100, 200, 500)),
+            1, start_s, end_s,
+            round(lat + rng.uniform(-0.5, 0.5), 5), round(lng + rng.uniform(-0.5, 0.5), 5),
+        )
+
+
+def _registrations(n, users, events, rng, now):
+    """Spread n registrations evenly over events; pairs are unique per event."""
+    per_event = max(1, n // events)
+    volunteers = users - 1
+    stride = 7919 if volunteers % 7919 else 7907  # prime, coprime with the user count
+    made = 0
+    for event_id in range(1, events + 1):
+        start = rng.randrange(volunteers)
+        for k in range(min(per_event, volunteers)):
+            if made >= n:
+                return
+            user_id = 2 + (start + k * stride) % volunteers
+            roll = rng.random()
+            reg_at = (now - timedelta(minutes=rng.randrange(3 * 365 * 24 * 60))).strftime("%Y-%m-%d %H:%M:%S")
+            if roll < 0.10:
+                yield (user_id, event_id, "cancelled", 0, reg_at, None, None, None, None, None, None, None)
+            elif roll < 0.55:
+                yield (user_id, event_id, "registered", 0, reg_at, None, None, None, None, None, None, None)
+            elif roll < 0.65:
+                # Submitted, waiting for approval
+                self_h = rng.choice((1.0, 2.0, 3.0))
+                yield (user_id, event_id, "registered", 0, reg_at, self_h, 0.0, None, reg_at,
+                       None, None, None)
+            else:
+                self_h = rng.choice((1.0, 2.0, 3.0))
+                extra = rng.choice((0.0, 0.0, 0.5, 1.0))
+                yield (user_id, event_id, "attended", self_h + extra, reg_at, self_h, extra,
+                       "Setup and cleanup" if extra else None, reg_at, self_h + extra, 1, reg_at)
+            made += 1
+
+
+def seed(path, users, events, registrations, seed_value=42):
+    """Create `path` from schema.sql and fill it. Returns row counts and timing."""
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rng = random.Random(seed_value)
+    now = datetime(2026, 1, 1, 9, 0)
+    t0 = time.perf_counter()
+
+    conn = sqlite3.connect(path)
+    with open(os.path.join(ROOT, "schema.sql"), encoding="utf-8") as f:
+        schema = f.read()
+    conn.executescript(schema)
+    # Bulk load without the per-row rollup triggers; rollups are rebuilt below.
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("PRAGMA journal_mode = OFF;")
+    conn.execute("PRAGMA synchronous = OFF;")
+
+    pw_hash = generate_password_hash(PASSWORD)
+    for chunk in _chunks(_users(users, pw_hash)):
+        conn.executemany(
+            "INSERT INTO users (name, email, role, password_hash) VALUES (?, ?, ?, ?)", chunk)
+    for chunk in _chunks(_events(events, rng, now)):
+        conn.executemany(
+            """
+            INSERT INTO events (title, description, date, location, capacity, created_by, start_dt, end_dt,
+                                lat, lng)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, chunk)
+    for chunk in _chunks(_registrations(registrations, users, events, rng, now)):
+        conn.executemany(
+            """
+            INSERT INTO registrations (user_id, event_id, status, hours, registered_at, self_hours,
+                                       extra_hours, extra_desc, submitted_at, approved_hours,
+                                       approved_by, approved_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, chunk)
+    conn.commit()
+    conn.executescript(ROLLUP_REBUILD_SQL)
+    conn.executescript(schema)
+    conn.commit()
+    conn.execute("ANALYZE;")
+    conn.execute("PRAGMA journal_mode = WAL;")
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("users", "events", "registrations")}
+    conn.close()
+    return {"db": path, "seed": seed_value, "counts": counts,
+            "seconds": round(time.perf_counter() - t0, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Volunteer Hub database.")
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "bench.db"))
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--registrations", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    print(json.dumps(seed(args.db, args.users, args.events, args.registrations, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
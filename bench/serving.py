@@ -0,0 +1,133 @@
+"""
+Serving benchmark: WSGI (Gunicorn) vs the ASGI entry point.
+
+Start both servers on the same database, then drive them with the same
+load, for example:
+
+    gunicorn -c gunicorn.conf.py -b 127.0.0.1:5000 wsgi:app      # WSGI
+    uvicorn asgi:asgi_app --port 8000 --workers 4                  # ASGI
+
+    python -m bench.serving --target wsgi=http://127.0.0.1:5000 \\
+        --target asgi=http://127.0.0.1:8000 --concurrency 100,500,1000
+
+Prints one JSON document with requests per second and latency percentiles
+for every target and concurrency level. At 1000 clients raise the open
+file limit first (ulimit -n 4096).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/", "/events", "/events/1"]
+
+
+def percentile(sorted_vals, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100.0 * len(sorted_vals))) - 1))
+    return sorted_vals[k]
+
+
+def summarize(latencies, errors, elapsed):
+    """Turn raw latencies (seconds) into the numbers we compare."""
+    lat = sorted(latencies)
+
+    def ms(v):
+        return round(v * 1000.0, 2) if v is not None else None
+
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(lat, 50)),
+        "p90_ms": ms(percentile(lat, 90)),
+        "p99_ms": ms(percentile(lat, 99)),
+        "max_ms": ms(lat[-1] if lat else None),
+    }
+
+
+async def _fetch(host, port, path, headers, timeout):
+    """One HTTP/1.1 request on a fresh connection; returns (status, raw response).
+
+    `path` is either "/url" (a GET) or "METHOD /url", e.g. "POST /events/3/register".
+    """
+    method, _, url = path.rpartition(" ")
+    method = method or "GET"
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        extra = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        if method != "GET":
+            extra += "Content-Length: 0\r\n"
+        writer.write(
+            f"{method} {url} HTTP/1.1\r\nHost: {host}\r\n{extra}Connection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status = int(raw.split(b" ", 2)[1]) if raw else 0
+    return status, raw
+
+
+async def _client(host, port, paths, deadline, headers, timeout, latencies, errors):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            status, _ = await _fetch(host, port, path, headers, timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            errors.append(path)
+            continue
+        if status == 0 or status >= 500:
+            errors.append(path)
+            continue
+        latencies.append(time.perf_counter() - t0)
+
+
+async def run_load(base_url, paths, concurrency, duration, headers=None, timeout=10.0):
+    """Run `concurrency` looping clients against base_url for `duration` seconds."""
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _client(host, port, paths, deadline, headers or {}, timeout, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    return summarize(latencies, len(errors), time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", action="append", required=True,
+                        help="label=http://host:port (repeat to compare servers)")
+    parser.add_argument("--path", action="append",
+                        help='path to request, optionally "METHOD /path" (repeatable)')
+    parser.add_argument("--concurrency", default="100,250,500,1000",
+                        help="comma separated client counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per run")
+    parser.add_argument("--cookie", help="Cookie header to send (e.g. a logged-in session)")
+    args = parser.parse_args(argv)
+
+    paths = args.path or DEFAULT_PATHS
+    headers = {"Cookie": args.cookie} if args.cookie else {}
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    results = {"paths": paths, "duration_s": args.duration, "targets": {}}
+    for target in args.target:
+        label, _, url = target.partition("=")
+        runs = results["targets"][label] = {}
+        for level in levels:
+            runs[str(level)] = asyncio.run(run_load(url, paths, level, args.duration, headers))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
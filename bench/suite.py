@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the main request paths.
+
+    python -m bench.seed --db instance/bench.db             # once
+    python -m bench.suite --db instance/bench.db --out bench.json
+
+    # optionally also over HTTP, against a server on the same database:
+    FLASK_DATABASE=$PWD/instance/bench.db gunicorn -c gunicorn.conf.py wsgi:app
+    python -m bench.suite --db instance/bench.db --http http://127.0.0.1:8000
+
+Every scenario runs in-process through the Flask test client (on a scratch
+copy of the database, so register_event writes don't pile up). With --http
+it also runs through the concurrent HTTP driver in bench/serving.py. The
+report is JSON. Pass --baseline old.json to add p50/p99 deltas, so runs
+from two commits can be compared.
+
+Requests send `Accept-Encoding: --accept-encoding` (default "gzip, br, zstd";
+"" for identity). Test-client results include a "compression" block per
+scenario: encoding used, bytes before/after, ratio and compression CPU time
+per request, taken from the app's metrics.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.serving import run_load, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name, method, role, relative weight (x --iterations), path builder
+SCENARIOS = [
+    ("home", "GET", None, 1.0, lambda ctx: "/"),
+    ("events", "GET", None, 1.0, lambda ctx: "/events"),
+    ("events_nearby", "GET", None, 1.0, lambda ctx: "/events/nearby?lat=24.7136&lng=46.6753&km=25"),
+    ("event_detail", "GET", "volunteer", 1.0, lambda ctx: f"/events/{ctx.event_id()}"),
+    ("register_event", "POST", "volunteer", 1.0, lambda ctx: f"/events/{ctx.event_id()}/register"),
+    ("dashboard_admin", "GET", "admin", 0.5, lambda ctx: "/admin"),
+    ("dashboard_volunteer", "GET", "volunteer", 1.0, lambda ctx: "/dashboard"),
+    ("export_csv", "GET", "admin", 0.05, lambda ctx: "/admin/export.csv"),
+    ("export_hours", "GET", "admin", 0.05, lambda ctx: "/admin/export_hours"),
+    ("certificate_pdf", "GET", "admin", 1.0, lambda ctx: f"/certificate/{ctx.reg_id()}.pdf"),
+]
+
+
+class Context:
+    """Random ids drawn from the seeded database (deterministic per --seed)."""
+
+    def __init__(self, db_path, seed):
+        conn = sqlite3.connect(db_path)
+        self.max_event = conn.execute("SELECT MAX(id) FROM events").fetchone()[0] or 1
+        self.max_reg = conn.execute("SELECT MAX(id) FROM registrations").fetchone()[0] or 1
+        self.admin_id = conn.execute(
+            "SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1").fetchone()[0]
+        self.volunteer_id = conn.execute(
+            "SELECT id FROM users WHERE role = 'volunteer' ORDER BY id LIMIT 1").fetchone()[0]
+        self.counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                       for t in ("users", "events", "registrations")}
+        conn.close()
+        self.rng = random.Random(seed)
+
+    def event_id(self):
+        return self.rng.randint(1, self.max_event)
+
+    def reg_id(self):
+        return self.rng.randint(1, self.max_reg)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _scratch_copy(db_path):
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="vh-bench-")
+    os.close(fd)
+    src, dst = sqlite3.connect(db_path), sqlite3.connect(path)
+    src.backup(dst)
+    src.close()
+    dst.close()
+    return path
+
+
+def _clients(app, ctx):
+    """One logged-in test client per role, plus its session cookie for HTTP.
+
+    The session is written through app's session interface (a sessions row
+    with the server-side backend), so for HTTP runs `app` must point at the
+    same database as the server.
+    """
+    clients, cookies = {None: app.test_client()}, {None: None}
+    for role, uid in (("admin", ctx.admin_id), ("volunteer", ctx.volunteer_id)):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = uid
+            sess["role"] = role
+        cookie = client.get_cookie(app.config.get("SESSION_COOKIE_NAME", "session"))
+        clients[role] = client
+        cookies[role] = f"{cookie.key}={cookie.value}" if cookie else None
+    return clients, cookies
+
+
+COMPRESSION_COUNTERS = {
+    "responses": "http_compressed_responses_total",
+    "bytes_in": "http_compression_bytes_in_total",
+    "bytes_out": "http_compression_bytes_out_total",
+    "cpu_s": "http_compression_cpu_seconds_total",
+}
+
+
+def _compression_counters(app):
+    """{encoding: {responses, bytes_in, bytes_out, cpu_s}} from the app's metrics."""
+    totals = {}
+    for (name, labels), value in list(app.extensions["metrics"].counters.items()):
+        for key, metric in COMPRESSION_COUNTERS.items():
+            if name == metric:
+                enc = dict(labels).get("encoding")
+                totals.setdefault(enc, dict.fromkeys(COMPRESSION_COUNTERS, 0))[key] += value
+    return totals
+
+
+def _compression_delta(before, after, requests):
+    out = {}
+    for enc, now in after.items():
+        was = before.get(enc, dict.fromkeys(COMPRESSION_COUNTERS, 0))
+        d = {k: now[k] - was[k] for k in COMPRESSION_COUNTERS}
+        if not d["responses"]:
+            continue
+        out[enc] = {
+            "responses": d["responses"],
+            "bytes_in": d["bytes_in"],
+            "bytes_out": d["bytes_out"],
+            "ratio": round(d["bytes_in"] / d["bytes_out"], 2) if d["bytes_out"] else None,
+            "cpu_ms_per_request": round(d["cpu_s"] * 1000.0 / max(1, requests), 3),
+        }
+    return out
+
+
+def run_test_client(app, ctx, iterations, accept_encoding=""):
+    """Run every scenario sequentially in-process; returns {name: summary}."""
+    clients, _ = _clients(app, ctx)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    results = {}
+    for name, method, role, weight, build in SCENARIOS:
+        client = clients[role]
+        n = max(3, int(iterations * weight))
+        latencies, errors, statuses = [], 0, {}
+        counters = _compression_counters(app)
+        started = time.perf_counter()
+        for _ in range(n):
+            path = build(ctx)
+            t0 = time.perf_counter()
+            try:
+                resp = client.open(path, method=method, headers=headers)
+                body = resp.get_data()  # drain streamed bodies too
+                resp.close()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+            statuses[str(resp.status_code)] = statuses.get(str(resp.status_code), 0) + 1
+            if resp.status_code >= 500:
+                errors += 1
+        summary = summarize(latencies, errors, time.perf_counter() - started)
+        summary["statuses"] = statuses
+        summary["bytes_last"] = len(body) if latencies else 0
+        summary["compression"] = _compression_delta(counters, _compression_counters(app), len(latencies))
+        results[name] = summary
+    return results
+
+
+def run_http(base_url, app, ctx, concurrency, duration, accept_encoding=""):
+    """Run every scenario against a live server with concurrent clients."""
+    _, cookies = _clients(app, ctx)
+    results = {}
+    for name, method, role, _, build in SCENARIOS:
+        paths = [f"{method} {build(ctx)}" for _ in range(200)]
+        headers = {"Cookie": cookies[role]} if cookies[role] else {}
+        if accept_encoding:
+            headers["Accept-Encoding"] = accept_encoding
+        results[name] = asyncio.run(run_load(base_url, paths, concurrency, duration, headers))
+    return results
+
+
+def compare(current, baseline):
+    """Percent change of p50/p99 per scenario against a previous report."""
+    deltas = {}
+    for mode, scenarios in current.items():
+        for name, summary in scenarios.items():
+            old = baseline.get("results", {}).get(mode, {}).get(name)
+            if not old:
+                continue
+            row = {}
+            for key in ("p50_ms", "p99_ms", "rps"):
+                if old.get(key) and summary.get(key) is not None:
+                    row[key] = round((summary[key] - old[key]) / old[key] * 100.0, 1)
+            deltas.setdefault(mode, {})[name] = row
+    return deltas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the main Volunteer Hub routes.")
+    parser.add_argument("--db", default=os.path.join(ROOT, "instance", "bench.db"),
+                        help="database made by `python -m bench.seed`")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="test-client requests per scenario (scaled by scenario weight)")
+    parser.add_argument("--http", help="base URL of a running server to drive over HTTP")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per HTTP scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--accept-encoding", default="gzip, br, zstd",
+                        help='Accept-Encoding header to send ("" for uncompressed responses)')
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} not found; run `python -m bench.seed` first")
+
+    sys.path.insert(0, ROOT)
+    from app import create_app
+
+    scratch = _scratch_copy(args.db)
+    try:
+        app = create_app({"DATABASE": scratch, "TESTING": True})
+        ctx = Context(scratch, args.seed)
+        report = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "counts": ctx.counts,
+            "accept_encoding": args.accept_encoding,
+            "results": {"test_client": run_test_client(app, ctx, args.iterations, args.accept_encoding)},
+        }
+        if args.http:
+            report["http"] = {"url": args.http, "concurrency": args.concurrency,
+                              "duration_s": args.duration}
+            # Sessions live server-side, so log in against the database the server uses.
+            http_app = create_app({"DATABASE": os.path.abspath(args.db)})
+            report["results"]["http"] = run_http(args.http, http_app, ctx, args.concurrency,
+                                                 args.duration, args.accept_encoding)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                report["delta_pct"] = compare(report["results"], json.load(f))
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(scratch + suffix):
+                os.remove(scratch + suffix)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,18 @@
-/* Dark mode toggle with Bootstrap 5.3 color modes + class fallback */
+/* "Use my location" on the events page fills in the near-me form */
 
 (function() {
-    const STORAGE_KEY = "vh-theme";
-    const body = document.getElementById("appBody");
-    const btn = document.getElementById("themeToggle");
-    const icon = document.getElementById("themeIcon");
-    const text = document.getElementById("themeText");
-    const html = document.documentElement; // <html>
+    const btn = document.getElementById("useLocation");
+    const form = document.getElementById("nearbyForm");
+    if (!btn || !form || !navigator.geolocation) return;
 
-    if (!body || !btn || !icon || !text) return;
-
-    function render(isDark) {
-        // Bootstrap color mode
-        html.setAttribute("data-bs-theme", isDark ? "dark" : "light");
-        // Our custom overrides
-        body.classList.toggle("theme-dark", isDark);
-        // Button UI
-        icon.textContent = isDark ? "☀️" : "🌙";
-        const labelOn = btn.getAttribute("data-label-on") || "Disable dark mode";
-        const labelOff = btn.getAttribute("data-label-off") || "Enable dark mode";
-        text.textContent = isDark ? labelOn : labelOff;
-        console.log("Dark mode:", isDark); // debug
-    }
-
-    // Apply stored preference on load
-    const saved = localStorage.getItem(STORAGE_KEY);
-    const startDark = saved === "dark";
-    render(startDark);
-
-    // Toggle
     btn.addEventListener("click", () => {
-        const isDark = !body.classList.contains("theme-dark");
-        localStorage.setItem(STORAGE_KEY, isDark ? "dark" : "light");
-        render(isDark);
+        btn.disabled = true;
+        navigator.geolocation.getCurrentPosition((pos) => {
+            form.elements.lat.value = pos.coords.latitude.toFixed(5);
+            form.elements.lng.value = pos.coords.longitude.toFixed(5);
+            form.submit();
+        }, () => {
+            btn.disabled = false;
+        }, { timeout: 10000 });
     });
-
 })();
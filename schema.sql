@@ -18,6 +18,32 @@ CREATE TABLE IF NOT EXISTS events (
   capacity INTEGER,
   created_by INTEGER,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  start_dt TEXT,
+  end_dt TEXT,
+  lat REAL,
+  lng REAL,
+  series_id INTEGER,
+  FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
+);
+
+-- Recurring events. Occurrences are computed from the rule when listed and
+-- only become events rows (with series_id set) once someone registers.
+CREATE TABLE IF NOT EXISTS event_series (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  title TEXT NOT NULL,
+  description TEXT,
+  location TEXT NOT NULL,
+  capacity INTEGER,
+  lat REAL,
+  lng REAL,
+  start_dt TEXT NOT NULL,
+  end_dt TEXT NOT NULL,
+  freq TEXT NOT NULL CHECK(freq IN ('daily','weekly')),
+  interval INTEGER NOT NULL DEFAULT 1 CHECK(interval >= 1),
+  until TEXT,
+  count INTEGER CHECK(count IS NULL OR count >= 1),
+  created_by INTEGER,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL
 );
 
@@ -28,6 +54,13 @@ CREATE TABLE IF NOT EXISTS registrations (
   status TEXT NOT NULL DEFAULT 'registered' CHECK(status IN ('registered','attended','cancelled')),
   hours REAL DEFAULT 0,
   registered_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  self_hours REAL,
+  extra_hours REAL,
+  extra_desc TEXT,
+  submitted_at TEXT,
+  approved_hours REAL,
+  approved_by INTEGER,
+  approved_at TEXT,
   UNIQUE(user_id, event_id),
   FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
   FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
@@ -36,3 +69,186 @@ CREATE TABLE IF NOT EXISTS registrations (
 CREATE INDEX IF NOT EXISTS idx_registrations_user ON registrations(user_id);
 CREATE INDEX IF NOT EXISTS idx_registrations_event ON registrations(event_id);
 CREATE INDEX IF NOT EXISTS idx_events_date ON events(date);
+-- Conflict checks probe "end_dt > candidate start": end_dt leads, so only
+-- events still running at that point are read. (start_dt, end_dt) could
+-- only be range-scanned on start_dt < candidate end, i.e. all past events.
+DROP INDEX IF EXISTS idx_events_times;
+CREATE INDEX IF NOT EXISTS idx_events_ends ON events(end_dt, start_dt);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_occurrence ON events(series_id, start_dt) WHERE series_id IS NOT NULL;
+
+-- Spatial index for /events/nearby: each located event is a zero-size box.
+-- R*Tree stores 32-bit floats and rounds boxes outwards, so it is only a
+-- prefilter; exact distances come from events.lat/lng.
+CREATE VIRTUAL TABLE IF NOT EXISTS events_geo USING rtree(id, min_lat, max_lat, min_lng, max_lng);
+
+CREATE TRIGGER IF NOT EXISTS trg_events_geo_insert AFTER INSERT ON events
+WHEN NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL
+BEGIN
+  INSERT INTO events_geo VALUES (NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_geo_update AFTER UPDATE OF lat, lng ON events
+BEGIN
+  DELETE FROM events_geo WHERE id = OLD.id;
+  INSERT INTO events_geo SELECT NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng
+   WHERE NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_geo_delete AFTER DELETE ON events
+BEGIN
+  DELETE FROM events_geo WHERE id = OLD.id;
+END;
+
+-- Index located events that predate the triggers (no-op once in sync).
+INSERT INTO events_geo (id, min_lat, max_lat, min_lng, max_lng)
+SELECT id, lat, lat, lng, lng FROM events
+ WHERE lat IS NOT NULL AND lng IS NOT NULL AND id NOT IN (SELECT id FROM events_geo);
+
+-- Reporting rollups: per event month ('YYYY-MM'), one row for all events
+-- (dim 'all', key ''), one per location and one per event id. Kept in step
+-- with registrations by the triggers below, inside the same transaction as
+-- the write; `flask rebuild-reports` recomputes them from scratch.
+CREATE TABLE IF NOT EXISTS report_rollups (
+  dim TEXT NOT NULL CHECK(dim IN ('all','location','event')),
+  bucket TEXT NOT NULL,
+  key TEXT NOT NULL,
+  registrations INTEGER NOT NULL DEFAULT 0,
+  attended INTEGER NOT NULL DEFAULT 0,
+  cancelled INTEGER NOT NULL DEFAULT 0,
+  hours REAL NOT NULL DEFAULT 0,
+  PRIMARY KEY (dim, bucket, key)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_reg_insert AFTER INSERT ON registrations
+BEGIN
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(e.start_dt, e.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN e.location ELSE CAST(e.id AS TEXT) END,
+         1, NEW.status = 'attended', NEW.status = 'cancelled', COALESCE(NEW.hours, 0)
+    FROM events e, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE e.id = NEW.event_id
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_reg_delete AFTER DELETE ON registrations
+BEGIN
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(e.start_dt, e.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN e.location ELSE CAST(e.id AS TEXT) END,
+         -1, -(OLD.status = 'attended'), -(OLD.status = 'cancelled'), -COALESCE(OLD.hours, 0)
+    FROM events e, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE e.id = OLD.event_id
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_reg_update AFTER UPDATE OF status, hours, event_id ON registrations
+BEGIN
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(e.start_dt, e.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN e.location ELSE CAST(e.id AS TEXT) END,
+         -1, -(OLD.status = 'attended'), -(OLD.status = 'cancelled'), -COALESCE(OLD.hours, 0)
+    FROM events e, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE e.id = OLD.event_id
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(e.start_dt, e.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN e.location ELSE CAST(e.id AS TEXT) END,
+         1, NEW.status = 'attended', NEW.status = 'cancelled', COALESCE(NEW.hours, 0)
+    FROM events e, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE e.id = NEW.event_id
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+END;
+
+-- Moving an event to another month or location moves its totals too.
+CREATE TRIGGER IF NOT EXISTS trg_rollup_event_move AFTER UPDATE OF date, start_dt, location ON events
+WHEN substr(COALESCE(OLD.start_dt, OLD.date), 1, 7) IS NOT substr(COALESCE(NEW.start_dt, NEW.date), 1, 7)
+  OR OLD.location IS NOT NEW.location
+BEGIN
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(OLD.start_dt, OLD.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN OLD.location ELSE CAST(OLD.id AS TEXT) END,
+         -COUNT(*), -SUM(r.status = 'attended'), -SUM(r.status = 'cancelled'), -COALESCE(SUM(r.hours), 0)
+    FROM registrations r, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE r.event_id = OLD.id
+   GROUP BY d.dim
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+  INSERT INTO report_rollups (dim, bucket, key, registrations, attended, cancelled, hours)
+  SELECT d.dim, substr(COALESCE(NEW.start_dt, NEW.date), 1, 7),
+         CASE d.dim WHEN 'all' THEN '' WHEN 'location' THEN NEW.location ELSE CAST(NEW.id AS TEXT) END,
+         COUNT(*), SUM(r.status = 'attended'), SUM(r.status = 'cancelled'), COALESCE(SUM(r.hours), 0)
+    FROM registrations r, (SELECT 'all' AS dim UNION ALL SELECT 'location' UNION ALL SELECT 'event') d
+   WHERE r.event_id = NEW.id
+   GROUP BY d.dim
+  ON CONFLICT (dim, bucket, key) DO UPDATE SET
+    registrations = registrations + excluded.registrations,
+    attended = attended + excluded.attended,
+    cancelled = cancelled + excluded.cancelled,
+    hours = hours + excluded.hours;
+END;
+
+-- Server-side sessions (SqliteSessionInterface in app.py). data is the
+-- session dict as tagged JSON; the cookie only carries id.
+CREATE TABLE IF NOT EXISTS sessions (
+  id TEXT PRIMARY KEY,
+  user_id INTEGER,
+  data TEXT NOT NULL,
+  expires_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
+
+-- Keep the role cached in sessions authoritative; end sessions of deleted users.
+CREATE TRIGGER IF NOT EXISTS trg_sessions_role AFTER UPDATE OF role ON users
+BEGIN
+  UPDATE sessions SET data = json_set(data, '$.role', NEW.role) WHERE user_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sessions_user_delete AFTER DELETE ON users
+BEGIN
+  DELETE FROM sessions WHERE user_id = OLD.id;
+END;
+
+-- Notification outbox. Admin actions insert rows in the same transaction as
+-- the change; `flask send-notifications` mails them as one digest per
+-- volunteer. payload is JSON (event title/date/location plus kind-specific
+-- fields), copied at insert time so the mail survives the event's deletion.
+CREATE TABLE IF NOT EXISTS notifications (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL,
+  kind TEXT NOT NULL,
+  event_id INTEGER,
+  payload TEXT NOT NULL DEFAULT '{}',
+  status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending','sent','failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  next_attempt_at TEXT NOT NULL DEFAULT (datetime('now')),
+  sent_at TEXT,
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_due ON notifications(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_notifications_status ON notifications(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_sent ON notifications(sent_at) WHERE sent_at IS NOT NULL;
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, get_db, init_db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "DATABASE": str(tmp_path / "app.db"),
+        "ARCHIVE_DATABASE": str(tmp_path / "archive.db"),
+        "BACKUP_DIR": str(tmp_path / "backups"),
+        "SLOW_QUERY_LOG": None,
+    })
+    with app.app_context():
+        init_db()
+        db = get_db()
+        db.execute("PRAGMA journal_mode = WAL")
+        db.executemany("INSERT INTO users (name, email, role, password_hash) VALUES (?, ?, ?, 'x')",
+                       [("Admin", "admin@example.org", "admin"), ("Vol", "vol@example.org", "volunteer")])
+        db.commit()
+    return app
+
+
+@pytest.fixture
+def admin(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["role"] = "admin"
+    return client
+
+
+def add_event(app, title, start, end, users=(2,)):
+    """Insert an event with registrations for `users`; returns the event id."""
+    with app.app_context():
+        db = get_db()
+        event_id = db.execute(
+            "INSERT INTO events (title, date, location, created_by, start_dt, end_dt) VALUES (?, ?, 'Hall', 1, ?, ?)",
+            (title, start.replace("T", " "), start, end)).lastrowid
+        db.executemany("INSERT INTO registrations (user_id, event_id) VALUES (?, ?)",
+                       [(u, event_id) for u in users])
+        db.commit()
+    return event_id
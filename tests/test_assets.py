@@ -0,0 +1,30 @@
+import json
+import os
+
+from app import build_assets, prune_assets
+
+
+def _build(static, css):
+    with open(static / "css" / "styles.css", "w") as f:
+        f.write(css)
+    manifest, missing = build_assets(str(static), fetch=False)
+    return manifest
+
+
+def test_builds_keep_earlier_files_until_pruned(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    first = _build(static, "body { color: red; }")
+    second = _build(static, "body { color: blue; }")
+    third = _build(static, "body { color: green; }")
+    paths = [m["css/styles.css"] for m in (first, second, third)]
+    assert len(set(paths)) == 3
+    assert all((static / p).is_file() and (static / (p + ".gz")).is_file() for p in paths)
+    with open(static / "dist" / "builds.json") as f:
+        assert [b["manifest"] for b in json.load(f)] == [third, second, first]
+
+    assert prune_assets(str(static), keep=2) == 2  # the first build's file and its .gz
+    assert not os.path.exists(static / paths[0])
+    assert (static / paths[1]).is_file() and (static / paths[2]).is_file()
+    with open(static / "dist" / "manifest.json") as f:
+        assert json.load(f) == third
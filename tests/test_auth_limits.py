@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from app import HashPool, create_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def site(app):
+    app.template_folder = ROOT  # the templates live next to app.py
+    return app
+
+
+def login(client, email, addr=None):
+    headers = {"X-Forwarded-For": addr} if addr else {}
+    return client.post("/login", data={"email": email, "password": "nope"}, headers=headers)
+
+
+def test_ip_limit_answers_429(site):
+    site.extensions["auth_limits"]["ip"].burst = 2.0
+    site.extensions["auth_limits"]["ip"].rate = 0.0
+    client = site.test_client()
+    assert [login(client, f"u{n}@example.org").status_code for n in range(3)] == [302, 302, 429]
+    assert int(login(client, "u9@example.org").headers["Retry-After"]) >= 1
+
+
+def test_full_hash_queue_answers_503(site):
+    pool = site.extensions["hash_pool"] = HashPool(workers=1, max_queue=0)
+    pool._take("check", 1)  # a hash already running
+    resp = login(site.test_client(), "vol@example.org")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+@pytest.mark.parametrize("proxies, expected", [(0, [302, 429]), (1, [302, 302])])
+def test_proxy_fix_gives_each_client_its_own_bucket(app, proxies, expected):
+    site = create_app({**app.config, "PROXY_FIX_X_FOR": proxies, "AUTH_RATE_IP": (1, 0.001)})
+    site.template_folder = ROOT
+    client = site.test_client()
+    codes = [login(client, f"u{n}@example.org", f"198.51.100.{n}").status_code for n in range(2)]
+    assert codes == expected
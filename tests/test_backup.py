@@ -0,0 +1,53 @@
+import csv
+import io
+
+from flask import g
+
+from app import archive_before, backup_database, get_db, live_archive, report_db
+
+from conftest import add_event
+
+
+def export_titles(client):
+    rows = list(csv.reader(io.StringIO(client.get("/admin/export.csv").get_data(as_text=True))))
+    return sorted(r[2] for r in rows[1:])
+
+
+def snapshot(app):
+    with app.app_context():
+        return backup_database(app.config["DATABASE"], app.config["BACKUP_DIR"], keep=7,
+                               archive=live_archive())
+
+
+def test_archive_after_snapshot_is_not_counted_twice(app, admin):
+    add_event(app, "Ancient", "2023-01-01T09:00", "2023-01-01T12:00")
+    add_event(app, "Old", "2024-01-01T09:00", "2024-01-01T12:00")
+    add_event(app, "New", "2030-01-01T09:00", "2030-01-01T12:00")
+    with app.app_context():
+        archive_before(get_db(), "2023-06-01")  # archive.db exists before the snapshot
+    report = snapshot(app)
+    assert report["archive"] is not None
+    with app.app_context():
+        archive_before(get_db(), "2025-01-01")  # moves "Old" after the snapshot
+
+    app.config["REPORTS_FROM_SNAPSHOT"] = True
+    assert export_titles(admin) == ["Ancient", "New", "Old"]
+    with app.test_request_context():
+        db = report_db()
+        assert db.execute("SELECT COUNT(*) FROM all_registrations").fetchone()[0] == 3
+        files = {r["name"]: r["file"] for r in db.execute("PRAGMA database_list")}
+        assert "backups" in files["main"] and "backups" in files["archive"]
+
+
+def test_snapshot_without_archive_copy_falls_back_to_live(app, admin):
+    add_event(app, "Old", "2024-01-01T09:00", "2024-01-01T12:00")
+    add_event(app, "New", "2030-01-01T09:00", "2030-01-01T12:00")
+    assert snapshot(app)["archive"] is None  # nothing archived yet
+    with app.app_context():
+        archive_before(get_db(), "2025-01-01")
+
+    app.config["REPORTS_FROM_SNAPSHOT"] = True
+    assert export_titles(admin) == ["New", "Old"]
+    with app.test_request_context():
+        report_db()
+        assert g.report_snapshot is None
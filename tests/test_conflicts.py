@@ -0,0 +1,52 @@
+from conftest import add_event
+
+from app import CONFLICTS_SQL, find_conflicts, get_db
+
+
+def volunteer(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 2
+        sess["role"] = "volunteer"
+    return client
+
+
+def registrations(app, event_id):
+    with app.app_context():
+        return get_db().execute("SELECT user_id, status FROM registrations WHERE event_id = ?",
+                                (event_id,)).fetchall()
+
+
+def test_touching_events_do_not_clash(app):
+    add_event(app, "Morning", "2030-05-01T09:00", "2030-05-01T12:00")
+    afternoon = add_event(app, "Afternoon", "2030-05-01T12:00", "2030-05-01T15:00", users=())
+    volunteer(app).post(f"/events/{afternoon}/register")
+    assert [tuple(r) for r in registrations(app, afternoon)] == [(2, "registered")]
+
+
+def test_cancelled_registrations_are_ignored(app):
+    morning = add_event(app, "Morning", "2030-05-01T09:00", "2030-05-01T12:00")
+    with app.app_context():
+        db = get_db()
+        db.execute("UPDATE registrations SET status = 'cancelled' WHERE event_id = ?", (morning,))
+        db.commit()
+        ev = {"id": None, "start_dt": "2030-05-01T10:00", "end_dt": "2030-05-01T11:00"}
+        assert find_conflicts(db, 2, ev) == []
+
+
+def test_clashing_registration_is_refused_and_not_written(app):
+    add_event(app, "Morning", "2030-05-01T09:00", "2030-05-01T12:00")
+    inside = add_event(app, "Brunch", "2030-05-01T11:00", "2030-05-01T13:00", users=())
+    resp = volunteer(app).post(f"/events/{inside}/register")
+    assert resp.status_code == 302
+    assert registrations(app, inside) == []
+    with app.app_context():
+        ev = get_db().execute("SELECT * FROM events WHERE id = ?", (inside,)).fetchone()
+        assert [c["title"] for c in find_conflicts(get_db(), 2, ev)] == ["Morning"]
+
+
+def test_conflict_check_probes_the_event_times_index(app):
+    with app.app_context():
+        plan = [r[3] for r in get_db().execute("EXPLAIN QUERY PLAN " + CONFLICTS_SQL,
+                                               ("2030-05-01T09:00", "2030-05-01T12:00", None, 2))]
+    assert any("idx_events_ends" in p for p in plan), plan
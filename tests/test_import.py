@@ -0,0 +1,73 @@
+import io
+import sqlite3
+
+from werkzeug.security import check_password_hash
+
+from app import get_db, import_events, import_users
+
+
+def test_failed_event_chunk_is_reported_and_later_chunks_go_on(app):
+    rows = [(n, {"title": f"Event {n}", "start_dt": "2030-05-01 09:00",
+                  "end_dt": "2030-05-01 12:00", "location": "Hall"}) for n in range(2, 8)]
+    with app.app_context():
+        db = get_db()
+        # Refuse one row of the second chunk (lines 4-5), as a constraint would.
+        db.execute("CREATE TEMP TRIGGER refuse BEFORE INSERT ON events WHEN NEW.title = 'Event 5' "
+                   "BEGIN SELECT RAISE(ABORT, 'refused'); END")
+        report = import_events(db, rows, created_by=1, chunk_size=2)
+        titles = [r[0] for r in db.execute("SELECT title FROM events ORDER BY id")]
+    assert titles == ["Event 2", "Event 3", "Event 6", "Event 7"]
+    assert report["inserted"] == 4 and report["rejected"] == 2
+    assert report["errors"] == [{"line": "4-5", "error": "Not imported: refused"}]
+
+
+def test_user_chunk_hit_by_concurrent_insert_is_reported(app, monkeypatch):
+    rows = [(2, {"name": "A", "email": "a@example.org", "password": "pw"}),
+            (3, {"name": "B", "email": "b@example.org", "password": "pw"})]
+    with app.app_context():
+        db = get_db()
+        # Another request registers b@ after the import read the existing emails.
+        other = sqlite3.connect(app.config["DATABASE"])
+        other.execute("INSERT INTO users (name, email, role, password_hash) VALUES ('B', 'b@example.org', 'volunteer', 'x')")
+        other.commit()
+        other.close()
+        monkeypatch.setattr(db, "execute", _hide_email(db.execute, "b@example.org"))
+        report = import_users(db, rows, workers=1)
+        count = db.execute("SELECT COUNT(*) FROM users WHERE email IN ('a@example.org', 'b@example.org')").fetchone()[0]
+    assert report["inserted"] == 0 and report["rejected"] == 2
+    assert report["errors"][0]["line"] == "2-3"
+    assert "UNIQUE" in report["errors"][0]["error"]
+    assert count == 1
+
+
+def _hide_email(execute, email):
+    def wrapped(sql, params=()):
+        if sql == "SELECT email FROM users":
+            return [(e,) for (e,) in execute(sql, params) if e != email]
+        return execute(sql, params)
+    return wrapped
+
+
+def _upload(client, lines):
+    body = "name,email,password\n" + "".join(f"U{n},u{n}@example.org,pw\n" for n in range(lines))
+    return client.post("/admin/users/import?format=json",
+                       data={"file": (io.BytesIO(body.encode()), "users.csv")})
+
+
+def test_web_user_import_hashes_on_the_hash_pool(app, admin, monkeypatch):
+    monkeypatch.setattr("app.ProcessPoolExecutor", None)  # the web route must not start processes
+    resp = _upload(admin, 3)
+    assert resp.status_code == 200
+    assert resp.get_json()["inserted"] == 3
+    with app.app_context():
+        row = get_db().execute("SELECT password_hash FROM users WHERE email = 'u2@example.org'").fetchone()
+        assert check_password_hash(row["password_hash"], "pw")
+
+
+def test_web_user_import_refuses_big_files(app, admin):
+    app.config["IMPORT_USERS_WEB_MAX"] = 2
+    resp = _upload(admin, 3)
+    assert resp.status_code == 413
+    assert "import-users" in resp.get_json()["error"]
+    with app.app_context():
+        assert get_db().execute("SELECT COUNT(*) FROM users").fetchone()[0] == 2
@@ -0,0 +1,16 @@
+def test_metrics_are_local_only_without_a_token(app):
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 200  # the test client connects from 127.0.0.1
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"}).status_code == 403
+    assert client.get("/metrics", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 403
+
+
+def test_metrics_token_is_required_when_set(app):
+    app.config["METRICS_TOKEN"] = "s3cret"
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"},
+                      environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    assert resp.status_code == 200
+    assert b"http_requests_total" in resp.data
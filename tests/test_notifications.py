@@ -0,0 +1,76 @@
+import json
+import smtplib
+from email.message import EmailMessage
+
+import pytest
+
+from app import DUE_DIGESTS_SQL, SmtpPool, build_digest, get_db
+
+from conftest import add_event
+
+
+def test_event_edit_queues_the_new_time(app, admin):
+    event_id = add_event(app, "Cleanup", "2027-01-02T10:00", "2027-01-02T12:00")
+    resp = admin.post(f"/admin/events/{event_id}/edit", data={
+        "title": "Cleanup", "start_dt": "2027-01-05T10:00", "end_dt": "2027-01-05T12:00", "location": "Hall",
+    })
+    assert resp.status_code == 302
+
+    with app.app_context():
+        db = get_db()
+        ev = db.execute("SELECT date, start_dt, end_dt FROM events WHERE id = ?", (event_id,)).fetchone()
+        assert tuple(ev) == ("2027-01-05T10:00", "2027-01-05T10:00", "2027-01-05T12:00")
+        rows = db.execute(DUE_DIGESTS_SQL, ("9999-12-31 00:00:00", 10)).fetchall()
+        assert [r["kind"] for r in rows] == ["event_updated"]
+        assert json.loads(rows[0]["payload"])["date"] == "2027-01-05 10:00"
+        body = build_digest(rows, "en", "hub@example.org").get_content()
+        assert "Cleanup: details changed, now 2027-01-05 10:00 at Hall." in body
+
+
+def test_edit_without_visible_changes_queues_nothing(app, admin):
+    event_id = add_event(app, "Cleanup", "2027-01-02T10:00", "2027-01-02T12:00")
+    admin.post(f"/admin/events/{event_id}/edit", data={
+        "title": "Cleanup", "start_dt": "2027-01-02T10:00", "end_dt": "2027-01-02T12:00", "location": "Hall",
+        "description": "Bring gloves.",
+    })
+    with app.app_context():
+        assert get_db().execute("SELECT COUNT(*) FROM notifications").fetchone()[0] == 0
+
+
+class FlakySMTP:
+    """Stub server connection; the first `failures` sends find it dropped."""
+
+    failures = 1
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.closed = False
+        self.sent = 0
+        FlakySMTP.opened.append(self)
+
+    def send_message(self, msg):
+        if FlakySMTP.failures:
+            FlakySMTP.failures -= 1
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent += 1
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_smtp_failure_on_a_new_connection_closes_it(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", FlakySMTP)
+    monkeypatch.setattr(FlakySMTP, "failures", 1)
+    monkeypatch.setattr(FlakySMTP, "opened", [])
+    pool = SmtpPool("mail.example.org", 25)
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool.send(EmailMessage())
+    assert [c.closed for c in FlakySMTP.opened] == [True]
+
+    pool.send(EmailMessage())
+    assert [c.sent for c in FlakySMTP.opened] == [0, 1]
+    pool.close()
+    assert all(c.closed for c in FlakySMTP.opened)
@@ -0,0 +1,79 @@
+import asyncio
+import importlib
+import json
+import sys
+import threading
+
+from conftest import add_event
+
+from app import ReadPool, get_db, read_db
+
+
+def test_read_pool_shares_at_most_size_connections(app):
+    add_event(app, "Cleanup", "2030-05-01T09:00", "2030-05-01T12:00")
+    pool = ReadPool(app.config["DATABASE"], size=2)
+    results, barrier = [], threading.Barrier(6)
+
+    def read():
+        barrier.wait()
+        for _ in range(20):
+            results.append(pool.query("SELECT title FROM events", one=True)["title"])
+
+    threads = [threading.Thread(target=read) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["Cleanup"] * 120
+    assert pool.opened <= 2 and pool.waiting == 0
+
+
+def _event_near_the_harbour(app):
+    event_id = add_event(app, "Cleanup", "2030-05-01T09:00", "2030-05-01T12:00")
+    with app.app_context():
+        db = get_db()
+        db.execute("UPDATE events SET lat = 36.8, lng = 10.18 WHERE id = ?", (event_id,))
+        db.commit()
+    return event_id
+
+
+def test_async_views_run_inline_under_wsgi(app):
+    event_id = _event_near_the_harbour(app)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 2
+        sess["role"] = "volunteer"
+    resp = client.get(f"/events/{event_id}/ics")
+    assert resp.status_code == 200
+    assert b"SUMMARY:Cleanup" in resp.data
+    resp = client.get("/events/nearby?format=json&lat=36.8&lng=10.18&km=5")
+    assert [ev["id"] for ev in resp.get_json()["events"]] == [event_id]
+    with app.app_context():
+        pool = read_db()
+        assert pool.opened >= 1
+        assert not pool.executor._threads  # no reader thread, no event loop
+
+
+def test_asgi_entry_point_reads_through_the_pool_threads(app, monkeypatch):
+    event_id = _event_near_the_harbour(app)
+    monkeypatch.setenv("FLASK_DATABASE", app.config["DATABASE"])
+    monkeypatch.setenv("FLASK_SLOW_QUERY_LOG", "")
+    sys.modules.pop("asgi", None)
+    asgi = importlib.import_module("asgi")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": "/events/nearby", "raw_path": b"/events/nearby", "root_path": "",
+             "query_string": b"format=json&lat=36.8&lng=10.18&km=5",
+             "headers": [(b"host", b"localhost")], "server": ("localhost", 80), "client": ("127.0.0.1", 5000)}
+    asyncio.run(asgi.asgi_app(scope, receive, send))
+    assert sent[0]["status"] == 200
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    assert [ev["id"] for ev in json.loads(body)["events"]] == [event_id]
+    assert asgi.app.extensions["read_pool"].executor._threads
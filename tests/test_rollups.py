@@ -0,0 +1,49 @@
+from conftest import add_event
+
+from app import archive_before, get_db, history_db, init_db, rebuild_rollups
+
+ROLLUPS = """
+    SELECT dim, bucket, key, registrations, attended, cancelled, round(hours, 6)
+      FROM report_rollups WHERE registrations != 0 ORDER BY dim, bucket, key
+"""
+
+
+def rollups(db):
+    return [tuple(r) for r in db.execute(ROLLUPS)]
+
+
+def test_trigger_deltas_match_a_full_rebuild(app):
+    old = add_event(app, "Old", "2020-03-01T09:00", "2020-03-01T12:00", users=(1, 2))
+    moved = add_event(app, "Moved", "2030-05-01T09:00", "2030-05-01T12:00", users=(1, 2))
+    kept = add_event(app, "Kept", "2030-06-01T09:00", "2030-06-01T11:00", users=(2,))
+    with app.app_context():
+        db = get_db()
+        db.execute("UPDATE registrations SET status = 'attended', hours = 3 WHERE event_id = ?", (old,))
+        db.execute("UPDATE registrations SET status = 'cancelled' WHERE event_id = ? AND user_id = 1", (moved,))
+        db.execute("UPDATE registrations SET hours = 2.5 WHERE event_id = ?", (kept,))
+        db.execute("DELETE FROM registrations WHERE event_id = ? AND user_id = 2", (kept,))
+        db.execute("INSERT INTO registrations (user_id, event_id, hours) VALUES (1, ?, 1.5)", (kept,))
+        db.execute("UPDATE events SET start_dt = '2030-07-02T09:00', date = '2030-07-02 09:00', "
+                   "location = 'Park' WHERE id = ?", (moved,))
+        db.commit()
+        assert archive_before(db, "2021-01-01") == {"events": 1, "registrations": 2}
+
+        incremental = rollups(db)
+        rebuild_rollups(history_db(), "all_events", "all_registrations")
+        assert incremental == rollups(db)
+        assert ("all", "2020-03", "", 2, 2, 0, 6.0) in incremental
+        assert ("location", "2030-07", "Park", 2, 0, 1, 0.0) in incremental
+
+
+def test_init_db_fills_rollups_on_an_upgraded_database(app):
+    add_event(app, "Cleanup", "2030-05-01T09:00", "2030-05-01T12:00", users=(1, 2))
+    with app.app_context():
+        db = get_db()
+        expected = rollups(db)
+        # A database from before report_rollups existed.
+        for (name,) in db.execute("SELECT name FROM sqlite_master WHERE name LIKE 'trg_rollup_%'").fetchall():
+            db.execute(f"DROP TRIGGER {name}")
+        db.execute("DROP TABLE report_rollups")
+        db.commit()
+        init_db()
+        assert rollups(db) == expected != []
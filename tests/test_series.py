@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+from app import SERIES_DT_FMT, get_db, listing_with_series, read_db, run_inline, series_occurrences
+
+
+def make_series(**rule):
+    series = {"id": 1, "title": "Shift", "description": "", "location": "Hall", "capacity": None,
+              "created_by": 1, "lat": None, "lng": None,
+              "start_dt": "2030-01-01T09:00", "end_dt": "2030-01-01T11:00",
+              "freq": "daily", "interval": 1, "until": None, "count": None}
+    series.update(rule)
+    return series
+
+
+def starts(series, window_start, window_end):
+    return [occ["start_dt"] for occ in series_occurrences(
+        series, datetime.strptime(window_start, SERIES_DT_FMT), datetime.strptime(window_end, SERIES_DT_FMT))]
+
+
+def test_interval_steps_and_keeps_length():
+    series = make_series(freq="weekly", interval=2)
+    occs = list(series_occurrences(series, datetime(2030, 1, 1), datetime(2030, 2, 1)))
+    assert [o["start_dt"] for o in occs] == ["2030-01-01T09:00", "2030-01-15T09:00", "2030-01-29T09:00"]
+    assert occs[1]["end_dt"] == "2030-01-15T11:00"
+
+
+def test_window_starting_mid_series_begins_at_next_occurrence():
+    series = make_series(interval=3)
+    # Day 0, 3, 6, ...; a window opening between occurrences skips to the next one.
+    assert starts(series, "2030-01-05T00:00", "2030-01-12T00:00") == [
+        "2030-01-07T09:00", "2030-01-10T09:00"]
+    # A window opening exactly on an occurrence includes it.
+    assert starts(series, "2030-01-07T09:00", "2030-01-08T00:00") == ["2030-01-07T09:00"]
+    # One minute later it is gone.
+    assert starts(series, "2030-01-07T09:01", "2030-01-08T00:00") == []
+
+
+def test_count_limits_occurrences_even_mid_window():
+    series = make_series(count=4)
+    assert starts(series, "2029-12-01T00:00", "2030-02-01T00:00") == [
+        "2030-01-01T09:00", "2030-01-02T09:00", "2030-01-03T09:00", "2030-01-04T09:00"]
+    assert starts(series, "2030-01-03T00:00", "2030-02-01T00:00") == [
+        "2030-01-03T09:00", "2030-01-04T09:00"]
+    assert starts(series, "2030-01-05T00:00", "2030-02-01T00:00") == []
+
+
+def test_until_includes_its_whole_day():
+    series = make_series(freq="weekly", until="2030-01-15")
+    assert starts(series, "2030-01-01T00:00", "2030-03-01T00:00") == [
+        "2030-01-01T09:00", "2030-01-08T09:00", "2030-01-15T09:00"]
+
+
+def add_series(app, start, end, freq="daily", count=None, until=None):
+    with app.app_context():
+        db = get_db()
+        series_id = db.execute(
+            """INSERT INTO event_series (title, location, start_dt, end_dt, freq, interval, until, count, created_by)
+               VALUES ('Shift', 'Hall', ?, ?, ?, 1, ?, ?, 1)""",
+            (start, end, freq, until, count)).lastrowid
+        db.commit()
+    return series_id
+
+
+def volunteer(app):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 2
+        sess["role"] = "volunteer"
+    return client
+
+
+def series_events(app, series_id):
+    with app.app_context():
+        return [r["start_dt"] for r in get_db().execute(
+            "SELECT start_dt FROM events WHERE series_id = ? ORDER BY start_dt", (series_id,))]
+
+
+def day(offset, hour):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return (today + timedelta(days=offset, hours=hour)).strftime(SERIES_DT_FMT)
+
+
+def test_past_occurrence_is_not_materialized(app):
+    series_id = add_series(app, day(-30, 9), day(-30, 11))
+    resp = volunteer(app).post(f"/series/{series_id}/{day(-20, 9)}/register")
+    assert resp.status_code == 302
+    assert series_events(app, series_id) == []
+
+
+def test_upcoming_occurrence_is_materialized_once(app):
+    series_id = add_series(app, day(-30, 9), day(-30, 11))
+    client = volunteer(app)
+    client.post(f"/series/{series_id}/{day(2, 9)}/register")
+    client.post(f"/series/{series_id}/{day(2, 9)}/register")
+    assert series_events(app, series_id) == [day(2, 9)]
+
+
+def test_listing_skips_occurrences_that_have_an_events_row(app):
+    series_id = add_series(app, day(1, 9), day(1, 11), count=3)
+    volunteer(app).post(f"/series/{series_id}/{day(2, 9)}/register")
+    with app.app_context():
+        listing = run_inline(listing_with_series)(read_db())
+    shifts = [(ev["id"] is not None, ev["start_dt"]) for ev in listing if ev["series_id"] == series_id]
+    assert shifts == [(False, day(1, 9)), (True, day(2, 9)), (False, day(3, 9))]
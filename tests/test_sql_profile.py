@@ -0,0 +1,68 @@
+import threading
+
+from app import (MY_CONFLICTS_SQL, NEARBY_SQL, _plan_cache_stats, _plan_for, _query_plans, get_db,
+                 is_full_scan, normalize_sql)
+
+
+def test_rtree_and_cte_scans_are_not_full_scans():
+    assert not is_full_scan([
+        "SCAN g VIRTUAL TABLE INDEX 2:D1B0D3B2",
+        "SEARCH e USING INTEGER PRIMARY KEY (rowid=?)",
+    ])
+    assert not is_full_scan([
+        "CO-ROUTINE (subquery-4)",
+        "CO-ROUTINE grouped",
+        "MATERIALIZE swept",
+        "SEARCH r USING INDEX idx_registrations_user (user_id=?)",
+        "SCAN (subquery-4)",
+        "SCAN grouped",
+        "SCAN swept",
+        "SCAN CONSTANT ROW",
+        "USE TEMP B-TREE FOR ORDER BY",
+    ])
+
+
+def test_table_scans_are_full_scans():
+    assert is_full_scan(["SCAN events"])
+    assert is_full_scan(["SCAN TABLE events"])
+    assert is_full_scan(["CO-ROUTINE grouped", "SCAN grouped", "SCAN r"])
+    assert not is_full_scan(["SCAN e USING COVERING INDEX idx_events_start"])
+
+
+def test_real_plans(app):
+    with app.app_context():
+        db = get_db()
+        for sql in (NEARBY_SQL, MY_CONFLICTS_SQL):
+            params = [0] * sql.count("?")
+            plan = [r[3] for r in db.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            assert not is_full_scan(plan), plan
+
+
+def test_server_timing_is_off_unless_enabled(app):
+    assert "Server-Timing" not in app.test_client().get("/events/nearby?format=json&lat=0&lng=0").headers
+    app.config["SQL_PROFILE"] = True
+    timing = app.test_client().get("/events/nearby?format=json&lat=0&lng=0").headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+
+
+def test_plan_cache_counts_every_lookup_once_across_threads(app):
+    sql = "SELECT id FROM events WHERE id = 424242"
+    before = dict(_plan_cache_stats)
+    barrier = threading.Barrier(8)
+
+    def explain():
+        with app.app_context():
+            db = get_db()
+            barrier.wait()
+            for _ in range(50):
+                _plan_for(db, sql, (), normalize_sql(sql))
+
+    threads = [threading.Thread(target=explain) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hits = _plan_cache_stats["hits"] - before["hits"]
+    misses = _plan_cache_stats["misses"] - before["misses"]
+    assert hits + misses == 400 and 1 <= misses <= 8
+    assert _query_plans[normalize_sql(sql)][1] is False
@@ -0,0 +1,12 @@
+"""
+Volunteer Hub - WSGI entry point for production servers
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+See gunicorn.conf.py for the worker model and reload instructions.
+"""
+
+from app import create_app
+
+app = create_app()